@@ -3,18 +3,22 @@
 Sends a compact JSON summary of static findings and architecture to Claude and
 returns its structured feedback.  When ``ANTHROPIC_API_KEY`` is absent the
 function returns a graceful no-op response so the rest of the analysis still
-works.
+works. The reply is streamed, and callers may pass ``on_text`` to see the
+review while it is being generated.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
-from typing import Any
+import threading
+from typing import Any, Callable, Iterator
 
 import anthropic
 
+from .. import cache as _cache
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -22,14 +26,33 @@ logger = logging.getLogger(__name__)
 _MAX_USER_CONTENT_CHARS = 6_000
 _MAX_FINDINGS_PER_CATEGORY = 5
 
+_MAX_OUTPUT_TOKENS = 512
+
+# Output tokens dominate latency, so the prompt asks for terse bullets only.
 _SYSTEM_PROMPT = (
-    "You are a senior software engineer reviewing code. "
-    "Identify bugs or logic errors, performance bottlenecks, and redundant or duplicated logic. "
-    "Flag AI-generated or boilerplate patterns and poor coding practices. "
-    "Assess the overall architecture for design inefficiencies or flaws. "
-    "Provide concise, actionable feedback on both immediate code issues and higher-level design concerns."
+    "Senior code reviewer: bullet-list bugs, performance issues, duplication, "
+    "AI-generated/boilerplate patterns, and architecture flaws. Be terse and actionable."
 )
 
+_anthropic_client: anthropic.Anthropic | None = None
+_anthropic_client_lock = threading.Lock()
+
+def _get_client() -> anthropic.Anthropic:
+    """Shared Anthropic client (connection reuse across analyses, thread-safe)."""
+    global _anthropic_client
+    if _anthropic_client is not None:
+        return _anthropic_client
+    with _anthropic_client_lock:
+        if _anthropic_client is not None:
+            return _anthropic_client
+        _anthropic_client = anthropic.Anthropic(
+            api_key=settings.anthropic_api_key,
+            timeout=anthropic.Timeout(60.0, connect=5.0),
+            # The SDK's own client class, so it matches whichever httpx build the SDK uses.
+            http_client=anthropic.DefaultHttpxClient(http2=True),
+        )
+    return _anthropic_client
+
 def _compact_summary(summary: dict) -> dict:
     """Trim per-category findings and strip absolute paths to basenames."""
     out: dict = {}
@@ -43,7 +66,9 @@ def _compact_summary(summary: dict) -> dict:
                 trimmed[cat] = items
                 continue
             capped = [
-                {**item, "file": os.path.basename(item["file"])} if "file" in item else item
+                {**item, "file": os.path.basename(item["file"])}
+                if isinstance(item, dict) and "file" in item
+                else item
                 for item in items[:_MAX_FINDINGS_PER_CATEGORY]
             ]
             trimmed[cat] = capped
@@ -53,14 +78,35 @@ def _compact_summary(summary: dict) -> dict:
     return out
 
 def _serialize(summary: dict) -> str:
-    text = json.dumps(summary, default=str)
+    """Minified JSON (no whitespace after separators), truncated to the prompt budget."""
+    text = json.dumps(summary, separators=(",", ":"), default=str)
     if len(text) > _MAX_USER_CONTENT_CHARS:
         text = text[: _MAX_USER_CONTENT_CHARS - 50] + '... "[truncated]"'
     return text
 
-def analyze_with_ai(summary: dict) -> dict[str, Any]:
+def _review_key(model: str, content: str) -> str:
+    """Stable cache key for a (model, serialized summary) pair."""
+    return hashlib.blake2b(f"{model}\0{content}".encode(), digest_size=16).hexdigest()
+
+def _stream_chat(system: str, user: str, *, model: str, max_tokens: int) -> Iterator[str]:
+    """Provider transport: stream one chat completion as text deltas.
+
+    Prompt building, caching and token caps live in the callers, so this is
+    the only function a different LLM provider would need to replace.
+    """
+    with _get_client().messages.stream(
+        model=model,
+        max_tokens=max_tokens,
+        system=system,
+        messages=[{"role": "user", "content": user}],
+    ) as stream:
+        yield from stream.text_stream
+
+def analyze_with_ai(summary: dict, on_text: Callable[[str], None] | None = None) -> dict[str, Any]:
     """Send *summary* to Claude and return its code-review findings.
 
+    *on_text*, if given, receives each text delta as Claude generates it.
+    Identical summaries are answered from an in-process TTL cache (no deltas).
     Returns ``{"enabled": False, ...}`` when the API key is missing.
     Returns ``{"enabled": True, "message": <text>}`` on success or API error.
     """
@@ -71,24 +117,30 @@ def analyze_with_ai(summary: dict) -> dict[str, Any]:
             "findings": [],
         }
 
-    model = settings.anthropic_model or "claude-3-opus-latest"
-    client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    model = settings.anthropic_model
+    content = _serialize(_compact_summary(summary))
+    error: list[Exception] = []
 
-    try:
-        response = client.messages.create(
-            model=model,
-            max_tokens=1024,
-            system=_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": _serialize(_compact_summary(summary))}],
-        )
-    except Exception as exc:
-        logger.exception("Claude request failed (model=%s)", model)
+    def _fetch() -> str | None:
+        parts: list[str] = []
+        try:
+            for delta in _stream_chat(_SYSTEM_PROMPT, content, model=model, max_tokens=_MAX_OUTPUT_TOKENS):
+                parts.append(delta)
+                if on_text is not None:
+                    on_text(delta)
+            return "".join(parts).strip() or None
+        except Exception as exc:
+            logger.exception("Claude request failed (model=%s)", model)
+            error.append(exc)
+            return None
+
+    text = _cache.cached_ai_review(_review_key(model, content), _fetch)
+    if error:
         return {
             "enabled": True,
-            "message": f"LLM request failed: {exc!s}. Check ANTHROPIC_API_KEY and ANTHROPIC_MODEL.",
+            "message": f"LLM request failed: {error[0]!s}. Check ANTHROPIC_API_KEY and ANTHROPIC_MODEL.",
         }
 
-    text = (response.content[0].text if response.content else "").strip()
     return {
         "enabled": True,
         "message": text or "The model returned no text. Verify ANTHROPIC_MODEL is set correctly.",
@@ -0,0 +1,78 @@
+"""On-disk cache for ``summarize_architecture`` results.
+
+Entries live as JSON files under ``$XDG_CACHE_HOME/openx-agent/arch`` (default
+``~/.cache``), one file per repo root. Each entry records the scan fingerprint
+(every walked path with its mtime and size) it was built from, so an edit
+anywhere in the tree overwrites the entry instead of adding another file.
+Entries expire after ``CACHE_TTL_ARCH`` seconds. Set ``OPENX_ARCH_CACHE=0``
+to turn the cache off.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_ARCH = 600
+# Bump when the summary format changes so stale entries are ignored.
+_FORMAT_VERSION = 2
+
+def _cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "openx-agent", "arch")
+
+def _key(root: str) -> str:
+    payload = json.dumps([_FORMAT_VERSION, os.path.abspath(root)], separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def load(root: str, fingerprint: str) -> dict[str, Any] | None:
+    """Return the cached summary for *root*, or ``None`` if disabled, missing, stale or unreadable."""
+    if not settings.arch_cache:
+        return None
+    key = _key(root)
+    try:
+        with open(os.path.join(_cache_dir(), f"{key}.json"), encoding="utf-8") as fh:
+            entry = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if entry.get("fingerprint") != fingerprint or entry.get("ttl_expiry", 0) < time.time():
+        return None
+    data = entry.get("data")
+    if not isinstance(data, dict):
+        return None
+    # JSON object keys are strings; the depth histogram is keyed by int.
+    depths = data.get("module_depth_distribution")
+    if isinstance(depths, dict):
+        data["module_depth_distribution"] = {int(k): v for k, v in depths.items()}
+    return data
+
+def save(root: str, fingerprint: str, data: dict[str, Any]) -> None:
+    """Store *data* for *root*. Written to a temp file and renamed, so readers never see a partial entry."""
+    if not settings.arch_cache:
+        return
+    key = _key(root)
+    directory = _cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(
+                    {"fingerprint": fingerprint, "ttl_expiry": time.time() + CACHE_TTL_ARCH, "data": data},
+                    fh,
+                )
+            os.replace(tmp, os.path.join(directory, f"{key}.json"))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except (OSError, TypeError, ValueError) as exc:
+        logger.debug("architecture cache write failed for %s: %s", root, exc)
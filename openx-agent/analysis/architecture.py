@@ -2,104 +2,243 @@
 
 from __future__ import annotations
 
+import hashlib
+import heapq
 import json
 import os
+import re
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from stat import S_ISREG
+from typing import Iterable
 
-from .static_analysis import SKIP_DIRS, _iter_code_files
+from . import arch_cache
+from .static_analysis import CODE_EXTENSIONS, SKIP_DIRS, _iter_code_files
 _LARGE_FILE_BYTES = 500_000
+_MAX_LARGE_FILES = 5
 
 _TEST_DIRS: frozenset[str] = frozenset({"test", "tests", "__tests__", "spec", "specs"})
 _TEST_NAME_FRAGMENTS: tuple[str, ...] = ("test_", "test-", "_test", "spec_", ".test.", ".spec.")
+# A prefix match is also a substring match, so one alternation covers every fragment.
+_TEST_NAME_RE = re.compile("|".join(map(re.escape, _TEST_NAME_FRAGMENTS)))
+# Root file name (lower-case) -> framework, for markers that need no content check.
+_SIMPLE_MARKERS: dict[str, str] = {
+    "pyproject.toml": "Python (pyproject)",
+    "requirements.txt": "Python",
+    "setup.py": "Python",
+    "go.mod": "Go",
+    "cargo.toml": "Rust",
+    "pom.xml": "Java/JVM",
+    "build.gradle": "Java/JVM",
+    "build.gradle.kts": "Java/JVM",
+}
+_JS_EXTENSIONS: frozenset[str] = frozenset({".ts", ".tsx", ".js", ".jsx"})
+_NODE_FRAMEWORK_MARKERS: tuple[bytes, ...] = (b"react", b"next", b"vue", b"nuxt", b"express")
 _WALK_SKIP: frozenset[str] = frozenset({".git", "node_modules", "__pycache__", ".venv", "venv"})
+_LINE_COUNT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_LINE_COUNT_MIN_PARALLEL = 16
+_READ_CHUNK = 1 << 16
+_HAS_FADVISE = hasattr(os, "posix_fadvise")  # Linux/BSD only
 
-def detect_frameworks(root: str) -> list[str]:
-    """Detect stacks from lock-files and config files in *root*."""
-    frameworks: list[str] = []
+@dataclass
+class RepoScan:
+    """Everything ``summarize_architecture`` needs, gathered in one directory walk."""
 
-    for entry in os.listdir(root):
-        if entry.startswith("."):
-            continue
-        path = os.path.join(root, entry)
-        if not os.path.isfile(path):
+    top_level_dirs: list[str] = field(default_factory=list)
+    root_files: list[tuple[str, str]] = field(default_factory=list)
+    code_paths: list[str] = field(default_factory=list)
+    language_breakdown: Counter[str] = field(default_factory=Counter)
+    module_depths: Counter[int] = field(default_factory=Counter)
+    # Min-heap of the ``_MAX_LARGE_FILES`` biggest ``(size, relpath)`` pairs.
+    large_files: list[tuple[int, str]] = field(default_factory=list)
+    has_tests: bool = False
+    truncated: bool = False  # a max_files/max_depth cap cut the walk short
+    # Digest of every path seen plus each file's mtime and size: any edit,
+    # however deep, changes it. Keys the on-disk ``arch_cache``.
+    fingerprint: str = ""
+
+def _scan_repo(root: str, max_files: int | None = None, max_depth: int | None = None) -> RepoScan:
+    """Walk *root* once with ``os.scandir``, collecting code files, sizes and test markers.
+
+    The walk prunes ``_WALK_SKIP`` like the risk check always did; code files are
+    only counted outside the wider ``SKIP_DIRS`` set, so the results match the
+    separate code-file walk without listing any directory twice.
+
+    Directories below *max_depth* are not entered, and the walk stops once
+    *max_files* files have been seen and a test marker has been found. Either
+    cap makes every count (and the large-file top five) a sample of the tree.
+    """
+    scan = RepoScan()
+    digest = hashlib.sha1()
+    files_seen = 0
+    # (directory, depth, counts as code?, inside a test directory?)
+    stack: list[tuple[str, int, bool, bool]] = [(root, 0, True, False)]
+    while stack:
+        base, depth, in_code, in_tests = stack.pop()
+        if in_tests:
+            scan.has_tests = True
+        try:
+            it = os.scandir(base)
+        except OSError:
+            if depth == 0:
+                raise
             continue
-        lower = entry.lower()
-
-        if lower == "package.json":
-            try:
-                with open(path, encoding="utf-8", errors="ignore") as fh:
-                    pkg = json.load(fh)
-                deps = {**(pkg.get("dependencies") or {}), **(pkg.get("devDependencies") or {})}
-                dep_str = str(deps)
-                if "react" in deps or "next" in dep_str:
-                    frameworks.append("React/Next.js")
-                elif "vue" in deps or "nuxt" in dep_str:
-                    frameworks.append("Vue/Nuxt")
-                elif "express" in deps:
-                    frameworks.append("Express")
-                else:
-                    frameworks.append("Node.js")
-            except Exception:
-                frameworks.append("Node.js")
-        elif lower == "pyproject.toml":
-            frameworks.append("Python (pyproject)")
-        elif lower in ("requirements.txt", "setup.py"):
-            frameworks.append("Python")
-        elif lower == "go.mod":
-            frameworks.append("Go")
-        elif lower == "cargo.toml":
-            frameworks.append("Rust")
-        elif lower in ("pom.xml", "build.gradle", "build.gradle.kts"):
-            frameworks.append("Java/JVM")
+        subdirs: list[tuple[str, int, bool, bool]] = []
+        with it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir():
+                    digest.update(os.fsencode(entry.path) + b"/\n")
+                    if depth == 0 and not name.startswith("."):
+                        scan.top_level_dirs.append(name)
+                    if max_depth is not None and depth >= max_depth:
+                        scan.truncated = True
+                        continue
+                    if name not in _WALK_SKIP and not entry.is_symlink():
+                        subdirs.append((
+                            entry.path,
+                            depth + 1,
+                            in_code and name not in SKIP_DIRS and not name.endswith(".egg-info"),
+                            in_tests or name.lower() in _TEST_DIRS,
+                        ))
+                    continue
+                files_seen += 1
+                if depth == 0 and not name.startswith(".") and entry.is_file():
+                    scan.root_files.append((name, entry.path))
+                if not scan.has_tests and _TEST_NAME_RE.search(name.lower()):
+                    scan.has_tests = True
+                # One lstat per file, reused for both the type and the size check.
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    st = None
+                digest.update(os.fsencode(entry.path))
+                if st is not None:
+                    digest.update(b"\0%d\0%d" % (st.st_mtime_ns, st.st_size))
+                digest.update(b"\n")
+                if st is not None and S_ISREG(st.st_mode) and st.st_size > _LARGE_FILE_BYTES:
+                    heap = scan.large_files
+                    if len(heap) < _MAX_LARGE_FILES:
+                        heapq.heappush(heap, (st.st_size, os.path.relpath(entry.path, root)))
+                    elif st.st_size > heap[0][0]:
+                        heapq.heapreplace(heap, (st.st_size, os.path.relpath(entry.path, root)))
+                if in_code:
+                    ext = os.path.splitext(name)[1].lower()
+                    if ext in CODE_EXTENSIONS:
+                        scan.module_depths[depth] += 1
+                        scan.language_breakdown[ext] += 1
+                        scan.code_paths.append(entry.path)
+                if max_files is not None and files_seen >= max_files and scan.has_tests:
+                    scan.truncated = True
+                    stack.clear()
+                    subdirs.clear()
+                    break
+        # Reversed onto the LIFO stack so directories are walked in os.walk order.
+        stack.extend(reversed(subdirs))
+    scan.top_level_dirs.sort()
+    scan.fingerprint = digest.hexdigest()
+    return scan
+
+def _node_framework(package_json: str) -> str:
+    try:
+        with open(package_json, "rb") as fh:
+            blob = fh.read()
+        # Every match below needs one of these substrings in the raw file, so most
+        # plain Node projects are answered without decoding or parsing the JSON.
+        if not any(marker in blob for marker in _NODE_FRAMEWORK_MARKERS):
+            return "Node.js"
+        pkg = json.loads(blob.decode("utf-8", errors="ignore"))
+        deps = {**(pkg.get("dependencies") or {}), **(pkg.get("devDependencies") or {})}
+    except Exception:
+        return "Node.js"
+    dep_str = str(deps)
+    if "react" in deps or "next" in dep_str:
+        return "React/Next.js"
+    if "vue" in deps or "nuxt" in dep_str:
+        return "Vue/Nuxt"
+    if "express" in deps:
+        return "Express"
+    return "Node.js"
+
+def _frameworks_from(root_files: list[tuple[str, str]], code_paths: Iterable[str]) -> list[str]:
+    """Detect stacks from the ``(name, path)`` files at the repo root.
+
+    *code_paths* is only consumed when no marker file matched.
+    """
+    # Insertion-ordered set: discovery order, no duplicates.
+    frameworks: dict[str, None] = {}
+
+    for name, path in root_files:
+        lower = name.lower()
+        marker = _SIMPLE_MARKERS.get(lower)
+        if marker is not None:
+            frameworks[marker] = None
+        elif lower == "package.json":
+            frameworks[_node_framework(path)] = None
         elif lower.startswith("dockerfile"):
-            frameworks.append("Docker")
+            frameworks["Docker"] = None
 
     if not frameworks:
         # Fall back to first recognised extension found while walking.
-        for path in _iter_code_files(root):
+        for path in code_paths:
             ext = os.path.splitext(path)[1].lower()
             if ext == ".py":
-                frameworks.append("Python")
+                frameworks["Python"] = None
                 break
-            if ext in (".ts", ".tsx", ".js", ".jsx"):
-                frameworks.append("TypeScript/JavaScript")
+            if ext in _JS_EXTENSIONS:
+                frameworks["TypeScript/JavaScript"] = None
                 break
 
-    # Preserve discovery order, remove duplicates.
-    return list(dict.fromkeys(frameworks))
+    return list(frameworks)
 
-def detect_risks(root: str) -> list[str]:
-    """Return a list of risk descriptions (large files, missing tests, etc.)."""
+def _risks_from(scan: RepoScan) -> list[str]:
     risks: list[str] = []
-    large_files: list[tuple[str, int]] = []
-    has_tests = False
-
-    for base, dirs, files in os.walk(root):
-        dirs[:] = [d for d in dirs if d not in _WALK_SKIP]
-        rel_base = os.path.relpath(base, root)
-        if any(part in _TEST_DIRS for part in rel_base.split(os.sep)):
-            has_tests = True
-
-        for name in files:
-            path = os.path.join(base, name)
-            lower = name.lower()
-            if any(lower.startswith(frag) or frag in lower for frag in _TEST_NAME_FRAGMENTS):
-                has_tests = True
-            try:
-                size = os.path.getsize(path)
-                if size > _LARGE_FILE_BYTES:
-                    large_files.append((os.path.relpath(path, root), size))
-            except OSError:
-                pass
-
-    if not has_tests:
+    if not scan.has_tests:
         risks.append("No obvious test directory or test files detected")
 
-    for rel, size in sorted(large_files, key=lambda x: -x[1])[:5]:
+    for size, rel in sorted(scan.large_files, reverse=True):
         risks.append(f"Large file: {rel} ({size // 1024} KB)")
 
     return risks
 
+def detect_frameworks(root: str) -> list[str]:
+    """Detect stacks from lock-files and config files in *root*."""
+    with os.scandir(root) as it:
+        root_files = [(e.name, e.path) for e in it if not e.name.startswith(".") and e.is_file()]
+    return _frameworks_from(root_files, _iter_code_files(root))
+
+def detect_risks(root: str, max_files: int | None = 20_000, max_depth: int | None = 8) -> list[str]:
+    """Return a list of risk descriptions (large files, missing tests, etc.).
+
+    The walk is capped by default; past the caps large-file detection is
+    best-effort. Pass ``None`` for an exhaustive walk.
+    """
+    return _risks_from(_scan_repo(root, max_files, max_depth))
+
+def _count_lines(path: str) -> int:
+    """Count lines in *path* by scanning raw 64 KiB chunks for newlines (no decoding).
+
+    A final line without a trailing newline still counts as a line.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return 0
+    try:
+        if _HAS_FADVISE:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        total = 0
+        last = b"\n"
+        while buf := os.read(fd, _READ_CHUNK):
+            total += buf.count(b"\n")
+            last = buf[-1:]
+        return total + (last != b"\n")
+    except OSError:
+        return 0
+    finally:
+        os.close(fd)
+
 def _architecture_insights(language_breakdown: dict[str, int], module_depths: Counter[int]) -> list[str]:
     if not language_breakdown:
         return ["No code files found for architecture insights"]
@@ -118,40 +257,54 @@ def _architecture_insights(language_breakdown: dict[str, int], module_depths: Co
 
     return notes
 
-def summarize_architecture(root: str) -> dict:
-    """Return a summary dict covering dirs, LOC, languages, frameworks, and risks."""
-    top_level_dirs = sorted(
-        e for e in os.listdir(root)
-        if not e.startswith(".") and os.path.isdir(os.path.join(root, e))
-    )
-    file_count = 0
-    total_lines = 0
-    language_breakdown: Counter[str] = Counter()
-    module_depths: Counter[int] = Counter()
-
-    for path in _iter_code_files(root):
-        file_count += 1
-        rel = os.path.relpath(path, root)
-        module_depths[rel.count(os.sep)] += 1
-        language_breakdown[os.path.splitext(path)[1].lower()] += 1
-        try:
-            with open(path, encoding="utf-8", errors="ignore") as fh:
-                total_lines += sum(1 for _ in fh)
-        except OSError:
-            pass
+def summarize_architecture(
+    root: str, *, max_files: int | None = None, max_depth: int | None = None,
+) -> dict:
+    """Return a summary dict covering dirs, LOC, languages, frameworks, and risks.
+
+    The walk is exhaustive unless *max_files*/*max_depth* are given (see
+    ``_scan_repo``); capped summaries gain ``"truncated": True`` when a cap hit.
+    Uncapped results are reused from the on-disk ``arch_cache`` while no file
+    in the walked tree has changed. A hit skips line counting and framework
+    detection; the directory walk itself always runs.
+    """
+    capped = max_files is not None or max_depth is not None
+    scan = _scan_repo(root, max_files, max_depth)
+    if not capped:
+        cached = arch_cache.load(root, scan.fingerprint)
+        if cached is not None:
+            return cached
+
+    code_paths = scan.code_paths
+    file_count = len(code_paths)
+
+    # Line counting is I/O-bound; threads overlap the reads (file I/O releases the GIL).
+    # For a handful of files, spinning up the pool costs more than it overlaps.
+    if file_count < _LINE_COUNT_MIN_PARALLEL:
+        total_lines = sum(map(_count_lines, code_paths))
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(_LINE_COUNT_WORKERS, file_count), thread_name_prefix="loc"
+        ) as pool:
+            total_lines = sum(pool.map(_count_lines, code_paths))
 
-    frameworks = detect_frameworks(root)
-    risks = detect_risks(root)
-    notes = _architecture_insights(dict(language_breakdown), module_depths)
+    frameworks = _frameworks_from(scan.root_files, code_paths)
+    risks = _risks_from(scan)
+    notes = _architecture_insights(dict(scan.language_breakdown), scan.module_depths)
     notes.extend(risks)
 
-    return {
-        "top_level_dirs": top_level_dirs,
+    summary = {
+        "top_level_dirs": scan.top_level_dirs,
         "code_file_count": file_count,
         "total_loc": total_lines,
-        "language_breakdown": dict(language_breakdown),
+        "language_breakdown": dict(scan.language_breakdown),
         "frameworks": frameworks,
         "risks": risks,
-        "module_depth_distribution": dict(module_depths),
+        "module_depth_distribution": dict(scan.module_depths),
         "architecture_notes": notes,
     }
+    if scan.truncated:
+        summary["truncated"] = True
+    if not capped:
+        arch_cache.save(root, scan.fingerprint, summary)
+    return summary
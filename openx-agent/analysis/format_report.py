@@ -7,6 +7,8 @@ file so the output is immediately actionable without needing to open an editor.
 from __future__ import annotations
 
 import os
+from collections import defaultdict
+from functools import lru_cache
 
 _EXT_TO_LANG: dict[str, str] = {
     ".py":  "python",
@@ -20,37 +22,66 @@ _EXT_TO_LANG: dict[str, str] = {
     ".rb":  "ruby",
     ".cs":  "csharp",
     ".cpp": "cpp",
+    ".cc":  "cpp",
     ".c":   "c",
     ".h":   "c",
     ".hpp": "cpp",
+    ".kt":  "kotlin",
+    ".swift": "swift",
 }
 
-def _read_line(path: str, line_num: int) -> str | None:
-    """Return the content of 1-based *line_num* in *path*, or ``None``."""
-    try:
-        with open(path, encoding="utf-8", errors="ignore") as fh:
-            for i, line in enumerate(fh, start=1):
-                if i == line_num:
-                    return line.rstrip()
-                if i > line_num:
-                    break
-    except OSError:
-        pass
-    return None
+_MAX_FINDINGS_SHOWN = 15
 
+def _collect_snippets(
+    static_findings: dict[str, list[dict]], cap: int = _MAX_FINDINGS_SHOWN,
+) -> dict[tuple[str, int], str]:
+    """Read every snippet the report will show, opening each file once.
+
+    Only the first *cap* findings per category are rendered, so only those are
+    looked up. Lines are split the same way ``static_analysis`` numbers findings.
+    """
+    wanted: dict[str, set[int]] = defaultdict(set)
+    for category, items in static_findings.items():
+        if category.endswith("_total"):
+            continue
+        for item in (items or [])[:cap]:
+            g = item.get
+            path, line = g("file"), g("line")
+            if path and line:
+                wanted[path].add(int(line))
+
+    snippets: dict[tuple[str, int], str] = {}
+    for path, line_nums in wanted.items():
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as fh:
+                lines = fh.read().splitlines()
+        except OSError:
+            continue
+        for num in line_nums:
+            if 0 < num <= len(lines):
+                snippets[(path, num)] = lines[num - 1].rstrip()
+    return snippets
+
+@lru_cache(maxsize=256)
 def _lang(path: str) -> str:
-    return _EXT_TO_LANG.get(os.path.splitext(path)[1].lower(), "text")
-
-def _format_finding(root: str, item: dict, include_snippet: bool = True) -> str:  # noqa: ARG001
-    filepath = item.get("file", "")
-    line = item.get("line", 0)
-    message = item.get("message", "")
-    parts = [f"- **{os.path.basename(filepath)}:{line}** — {message}"]
-    if include_snippet and filepath and line:
-        content = _read_line(filepath, int(line))
+    # Same rules as os.path.splitext: only the basename counts, and leading dots
+    # (``.bashrc``) do not start an extension.
+    start = max(path.rfind("/"), path.rfind(os.sep)) + 1
+    dot = path.rfind(".")
+    if dot <= start or not path[start:dot].lstrip("."):
+        return "text"
+    return _EXT_TO_LANG.get(path[dot:].lower(), "text")
+
+def _format_finding(item: dict, snippets: dict[tuple[str, int], str]) -> str:
+    g = item.get
+    filepath = g("file", "")
+    line = g("line", 0)
+    header = f"- **{os.path.basename(filepath)}:{line}** — {g('message', '')}"
+    if filepath and line:
+        content = snippets.get((filepath, int(line)))
         if content:
-            parts.append(f"  ```{_lang(filepath)}\n  {content}\n  ```")
-    return "\n".join(parts)
+            return f"{header}\n  ```{_lang(filepath)}\n  {content}\n  ```"
+    return header
 
 def format_analysis_report(
     root: str,
@@ -62,54 +93,53 @@ def format_analysis_report(
 
     Sections: Architecture → Static findings → AI analysis.
     """
-    sections: list[str] = []
+    # One flat list and a single join at the end; sections are separated by a blank line.
+    out: list[str] = []
+    add = out.append
 
     # ── Architecture ──────────────────────────────────────────────────────────
-    arch_lines = ["## Architecture", ""]
-    arch_lines.append(
-        f"- **Top-level dirs:** {', '.join(architecture.get('top_level_dirs', []) or ['(none)'])}"
-    )
-    arch_lines.append(f"- **Code files:** {architecture.get('code_file_count', 0)}")
-    arch_lines.append(f"- **Total lines:** {architecture.get('total_loc', 0)}")
-
-    lang_break = architecture.get("language_breakdown") or {}
+    arch = architecture.get
+    add("## Architecture")
+    add("")
+    add(f"- **Top-level dirs:** {', '.join(arch('top_level_dirs', []) or ['(none)'])}")
+    add(f"- **Code files:** {arch('code_file_count', 0)}")
+    add(f"- **Total lines:** {arch('total_loc', 0)}")
+
+    lang_break = arch("language_breakdown") or {}
     if lang_break:
-        arch_lines.append(
-            f"- **Languages:** {', '.join(f'{k} ({v})' for k, v in sorted(lang_break.items()))}"
-        )
-    frameworks = architecture.get("frameworks") or []
+        languages = ", ".join([f"{k} ({v})" for k, v in sorted(lang_break.items())])
+        add(f"- **Languages:** {languages}")
+    frameworks = arch("frameworks") or []
     if frameworks:
-        arch_lines.append(f"- **Frameworks detected:** {', '.join(frameworks)}")
+        add(f"- **Frameworks detected:** {', '.join(frameworks)}")
 
-    risks = architecture.get("risks") or []
+    risks = arch("risks") or []
     if risks:
-        arch_lines.append("- **Risks:**")
-        arch_lines.extend(f"  - {r}" for r in risks)
-
-    for note in (architecture.get("architecture_notes") or []):
-        arch_lines.append(f"- {note}")
+        add("- **Risks:**")
+        out.extend([f"  - {r}" for r in risks])
 
-    sections.append("\n".join(arch_lines))
+    out.extend([f"- {note}" for note in (arch("architecture_notes") or [])])
+    add("")
 
     # ── Static findings ───────────────────────────────────────────────────────
-    finding_lines = ["## Static findings", ""]
+    add("## Static findings")
+    add("")
     if not static_findings:
-        finding_lines.append("No issues found.")
+        add("No issues found.")
     else:
+        snippets = _collect_snippets(static_findings)
         for category, items in static_findings.items():
             if category.endswith("_total"):
                 continue
-            finding_lines.append(f"### {category.replace('_', ' ').title()}")
-            finding_lines.append("")
-            capped = (items or [])[:15]
-            for item in capped:
-                finding_lines.append(_format_finding(root, item))
-                finding_lines.append("")
-            if len(items or []) > 15:
-                finding_lines.append(f"  _… and {len(items) - 15} more._")
-                finding_lines.append("")
-
-    sections.append("\n".join(finding_lines))
+            add(f"### {category.replace('_', ' ').title()}")
+            add("")
+            for item in (items or [])[:_MAX_FINDINGS_SHOWN]:
+                add(_format_finding(item, snippets))
+                add("")
+            if len(items or []) > _MAX_FINDINGS_SHOWN:
+                add(f"  _… and {len(items) - _MAX_FINDINGS_SHOWN} more._")
+                add("")
+    add("")
 
     # ── AI analysis ───────────────────────────────────────────────────────────
     ai_message = (
@@ -120,6 +150,8 @@ def format_analysis_report(
             else "No AI summary returned."
         )
     )
-    sections.append("\n".join(["## AI analysis", "", ai_message.strip()]))
+    add("## AI analysis")
+    add("")
+    add(ai_message.strip())
 
-    return "\n\n".join(sections).strip()
+    return "\n".join(out).strip()
@@ -9,21 +9,22 @@ from __future__ import annotations
 import hashlib
 import os
 import re
-from collections import Counter, defaultdict
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterator
 
 CODE_EXTENSIONS: frozenset[str] = frozenset({
     ".py", ".js", ".ts", ".tsx", ".jsx",
     ".go", ".java", ".rb", ".rs", ".cs",
-    ".cpp", ".c", ".h", ".hpp",
+    ".cpp", ".cc", ".c", ".h", ".hpp",
+    ".kt", ".swift",
 })
 
 SKIP_DIRS: frozenset[str] = frozenset({
     ".git", ".venv", "venv", "env", ".env",
     "node_modules", "__pycache__", ".mypy_cache", ".pytest_cache",
     "target", "build", "dist", ".tox", ".eggs", "egg-info",
-    ".next", ".nuxt", "vendor", "site-packages",
+    ".next", ".nuxt", "vendor", "site-packages", ".cache",
 })
 
 _AI_MARKERS: tuple[str, ...] = (
@@ -50,7 +51,8 @@ _BUG_HINTS: list[tuple[re.Pattern[str], str]] = [
 
 # Data model
 
-@dataclass(frozen=True)
+# slots: one instance per finding, and large repos produce tens of thousands.
+@dataclass(frozen=True, slots=True)
 class Issue:
     category: str
     message: str
@@ -59,16 +61,36 @@ class Issue:
 
 # Helpers
 
-def _iter_code_files(root: str) -> Iterable[str]:
-    """Walk *root*, yielding paths of recognised code files."""
-    for base, dirs, files in os.walk(root):
-        dirs[:] = [
-            d for d in dirs
-            if d not in SKIP_DIRS and not d.endswith(".egg-info")
-        ]
-        for name in files:
-            if os.path.splitext(name)[1].lower() in CODE_EXTENSIONS:
-                yield os.path.join(base, name)
+def _iter_code_files(root: str) -> Iterator[str]:
+    """Yield the path of every code file under *root*.
+
+    Iterative ``os.scandir`` walk: skipped and symlinked directories are pruned
+    before they are opened, so ``node_modules``/``.git``/build output are never
+    listed and symlink cycles cannot occur. Files come out in ``os.walk``
+    top-down order, which decides which findings the report shows first.
+    """
+    stack = [root]
+    while stack:
+        base = stack.pop()
+        subdirs: list[str] = []
+        try:
+            with os.scandir(base) as it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir():
+                        if (
+                            not entry.is_symlink()
+                            and name not in SKIP_DIRS
+                            and not name.endswith(".egg-info")
+                        ):
+                            subdirs.append(entry.path)
+                        continue
+                    if os.path.splitext(name)[1].lower() in CODE_EXTENSIONS:
+                        yield entry.path
+        except OSError:
+            continue
+        # Reversed onto the LIFO stack so the first listed subdirectory is walked first.
+        stack.extend(reversed(subdirs))
 
 def _read_lines(path: str) -> list[str]:
     try:
@@ -140,10 +162,3 @@ def analyze_static(root: str) -> dict[str, list[dict]]:
             {"message": issue.message, "file": issue.file, "line": issue.line}
         )
     return dict(grouped)
-
-def file_stats(root: str) -> dict[str, int]:
-    """Count code files by extension under *root*."""
-    counts: Counter[str] = Counter(
-        os.path.splitext(path)[1].lower() for path in _iter_code_files(root)
-    )
-    return dict(counts)
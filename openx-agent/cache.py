@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import heapq
+import pickle
+import sys
 import threading
 import time
 from collections import OrderedDict
@@ -11,55 +14,182 @@ T = TypeVar("T")
 CACHE_TTL_REPO = 120
 CACHE_TTL_LIST = 60
 CACHE_TTL_PR = 90
+CACHE_TTL_AI = 900
+CACHE_TTL_ETAG = 600
+CACHE_TTL_GH = 15
+
+_MISS = object()  # sentinel for absent keys in dict.get
+# Python 3.13+ free-threaded builds have no GIL to make single dict operations atomic.
+_NEEDS_LOCK = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+def _nested_items_reach(value: Any, limit: int) -> bool:
+    """True if the dicts/lists/tuples in *value* hold at least *limit* items in total.
+
+    Stops as soon as *limit* is reached, so the walk is O(limit) however big
+    *value* is.
+    """
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        items = obj.values() if isinstance(obj, dict) else obj
+        limit -= len(obj)
+        if limit <= 0:
+            return True
+        stack.extend(v for v in items if isinstance(v, (dict, list, tuple)))
+    return False
+
+class _Packed:
+    """A cached value stored as a pickle (protocol 5) blob instead of live objects."""
+
+    __slots__ = ("blob",)
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
 
 class TTLCache:
-    """Thread-safe TTL cache with O(1) LRU eviction."""
+    """Thread-safe TTL cache with O(1) LRU eviction and heap-ordered expiry."""
+
+    def __init__(self, default_ttl: float, max_size: int = 500, pack_threshold: int | None = None):
+        """*pack_threshold*: pickle dict/list values holding at least this many nested items.
 
-    def __init__(self, default_ttl: float, max_size: int = 500):
+        Pickling removes per-object overhead, not string payload, so only
+        values made of many small objects are packed; every hit on them
+        returns a fresh copy. Unpicklable values are stored as-is.
+        """
         self._default_ttl = default_ttl
         self._max_size = max_size
-        self._data: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._pack_threshold = pack_threshold
+        self._data: OrderedDict[str, tuple[Any, int]] = OrderedDict()  # value, expiry (monotonic ns)
+        # (expiry, key) min-heap; entries go stale on overwrite/eviction and are skipped on pop.
+        self._expiry_heap: list[tuple[int, str]] = []
         self._lock = threading.Lock()
 
     def get(self, key: str) -> Any | None:
+        """Return the live value for *key*, or ``None``.
+
+        Hits take no lock under the GIL: OrderedDict's C operations are atomic
+        there, so LRU recency under concurrent reads is best-effort. Free-threaded
+        builds always lock.
+        """
+        if _NEEDS_LOCK:
+            with self._lock:
+                return self._get(key)
+        return self._get(key)
+
+    def _get(self, key: str) -> Any | None:
+        entry = self._data.get(key, _MISS)
+        if entry is _MISS:
+            return None
+        val, expiry = entry
+        if time.monotonic_ns() > expiry:
+            self._discard(key, entry)
+            return None
+        try:
+            self._data.move_to_end(key)
+        except KeyError:  # evicted or cleared by a concurrent writer
+            pass
+        if type(val) is _Packed:
+            return pickle.loads(val.blob)
+        return val
+
+    def _discard(self, key: str, entry: tuple[Any, int]) -> None:
+        """Delete *key* only if it still holds *entry* (a concurrent set may have refreshed it)."""
+        if _NEEDS_LOCK:
+            # Caller already holds the lock.
+            del self._data[key]
+            return
         with self._lock:
-            if key not in self._data:
-                return None
-            val, expiry = self._data[key]
-            if time.monotonic() > expiry:
+            if self._data.get(key) is entry:
                 del self._data[key]
-                return None
-            self._data.move_to_end(key)
-            return val
 
     def set(self, key: str, value: Any, ttl: float | None = None) -> None:
         effective_ttl = ttl if ttl is not None else self._default_ttl
-        expiry = time.monotonic() + effective_ttl
+        expiry = time.monotonic_ns() + int(effective_ttl * 1_000_000_000)
+        if self._pack_threshold is not None:
+            value = self._pack(value)
         with self._lock:
+            self._purge_expired_locked()
+            heapq.heappush(self._expiry_heap, (expiry, key))
             if key in self._data:
                 self._data.move_to_end(key)
-                self._data[key] = (value, expiry)
-                return
-            if len(self._data) >= int(self._max_size * 0.8):
-                self._purge_expired_locked()
-            if len(self._data) >= self._max_size:
+            elif len(self._data) >= self._max_size:
                 self._data.popitem(last=False)
             self._data[key] = (value, expiry)
+            if len(self._expiry_heap) > 2 * self._max_size:
+                self._rebuild_heap_locked()
+
+    def _pack(self, value: Any) -> Any:
+        if not isinstance(value, (dict, list)) or not _nested_items_reach(value, self._pack_threshold):
+            return value
+        try:
+            blob = pickle.dumps(value, protocol=5)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return value
+        return _Packed(blob)
 
     def _purge_expired_locked(self) -> None:
-        """Remove all expired entries. Must be called with `_lock` held."""
-        now = time.monotonic()
-        expired = [k for k, (_, exp) in self._data.items() if now > exp]
-        for k in expired:
-            del self._data[k]
+        """Pop expired heap heads, dropping entries whose expiry still matches. Hold `_lock`."""
+        heap = self._expiry_heap
+        now = time.monotonic_ns()
+        while heap and heap[0][0] < now:
+            exp, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == exp:
+                del self._data[key]
+
+    def _rebuild_heap_locked(self) -> None:
+        """Drop stale heap entries left by overwrites and LRU evictions. Hold `_lock`."""
+        self._expiry_heap = [(exp, k) for k, (_, exp) in self._data.items()]
+        heapq.heapify(self._expiry_heap)
 
     def clear(self) -> None:
         with self._lock:
             self._data.clear()
+            self._expiry_heap.clear()
+
+class StripedTTLCache:
+    """``TTLCache`` split into independently locked shards to cut writer contention.
+
+    Keys are routed by hash; capacity and LRU order are per shard.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float,
+        max_size: int = 512,
+        shards: int = 16,
+        pack_threshold: int | None = None,
+    ):
+        if shards & (shards - 1):
+            raise ValueError("shards must be a power of two")
+        self._mask = shards - 1
+        per_shard = max(1, max_size // shards)
+        self._shards = [
+            TTLCache(default_ttl, max_size=per_shard, pack_threshold=pack_threshold)
+            for _ in range(shards)
+        ]
 
-_repo_cache = TTLCache(CACHE_TTL_REPO)
-_list_cache = TTLCache(CACHE_TTL_LIST)
-_pr_cache = TTLCache(CACHE_TTL_PR)
+    def _shard(self, key: str) -> TTLCache:
+        return self._shards[hash(key) & self._mask]
+
+    def get(self, key: str) -> Any | None:
+        return self._shard(key).get(key)
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._shard(key).set(key, value, ttl)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+_repo_cache = StripedTTLCache(CACHE_TTL_REPO, max_size=512)
+# Repo/PR lists run to hundreds of small dicts; a single PR (mostly one diff string) stays live.
+_PACK_THRESHOLD = 256
+_list_cache = StripedTTLCache(CACHE_TTL_LIST, max_size=512, pack_threshold=_PACK_THRESHOLD)
+_pr_cache = StripedTTLCache(CACHE_TTL_PR, max_size=512, pack_threshold=_PACK_THRESHOLD)
+_ai_cache = TTLCache(CACHE_TTL_AI, max_size=512)
+_etag_cache = TTLCache(CACHE_TTL_ETAG, max_size=256)
+_gh_cache = TTLCache(CACHE_TTL_GH, max_size=256)
 
 def cached_repo(full_name: str, fetcher: Callable[[], T]) -> T:
     """Return cached repo or call fetcher and cache result."""
@@ -94,8 +224,45 @@ def cached_pr(repo_full_name: str, number: int, fetcher: Callable[[], T]) -> T:
     _pr_cache.set(key, out)
     return out  # type: ignore[return-value]
 
+def cached_ai_review(key: str, fetcher: Callable[[], T | None]) -> T | None:
+    """Return a cached AI review or call fetcher. ``None`` (a failed review) is not cached."""
+    out = _ai_cache.get(key)
+    if out is not None:
+        return out  # type: ignore[return-value]
+    out = fetcher()
+    if out is not None:
+        _ai_cache.set(key, out)
+    return out
+
+def etag_lookup(url: str) -> tuple[str, Any] | None:
+    """Return ``(etag, payload)`` from the last 200 response for *url*, if any."""
+    return _etag_cache.get(url)
+
+def etag_store(url: str, etag: str, payload: Any) -> None:
+    """Remember *payload* for *url* so the next request can be made conditional."""
+    _etag_cache.set(url, (etag, payload))
+
+def cached_gh(args: tuple[str, ...], fetcher: Callable[[], T | None]) -> T | None:
+    """Return cached stdout of a read-only gh command. Failures (``None`` or empty) are not cached."""
+    key = "\0".join(args)
+    out = _gh_cache.get(key)
+    if out is not None:
+        return out  # type: ignore[return-value]
+    out = fetcher()
+    if out:
+        _gh_cache.set(key, out)
+    return out
+
+def clear_gh_cache() -> None:
+    """Drop cached gh reads and the repo/PR lists built from them (after any write)."""
+    _gh_cache.clear()
+    _list_cache.clear()
+
 def clear_caches() -> None:
     """Clear all caches (e.g. after long-running write operations)."""
     _repo_cache.clear()
     _list_cache.clear()
     _pr_cache.clear()
+    _ai_cache.clear()
+    _etag_cache.clear()
+    _gh_cache.clear()
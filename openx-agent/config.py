@@ -4,16 +4,38 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from urllib.parse import urlparse
 
 
-@dataclass(frozen=True)
+def _env_flag(name: str, default: bool = True) -> bool:
+    """Boolean env switch: "0", "false", "no" and "off" turn it off."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+@dataclass(frozen=True, slots=True)
 class Settings:
     github_token: str | None = os.getenv("GITHUB_TOKEN")
     github_base_url: str | None = os.getenv("GITHUB_BASE_URL")
     anthropic_api_key: str | None = os.getenv("ANTHROPIC_API_KEY")
-    anthropic_model: str = os.getenv("ANTHROPIC_MODEL", "claude-3-opus-latest")
+    # ``or`` also covers ANTHROPIC_MODEL set to "", so callers never need a fallback.
+    anthropic_model: str = os.getenv("ANTHROPIC_MODEL") or "claude-3-opus-latest"
     workspace_root: str = os.getenv("OPENX_WORKSPACE_ROOT", os.getcwd())
     active_repo: str | None = os.getenv("OPENX_ACTIVE_REPO")
+    # Spawn gh without close_fds on POSIX; set OPENX_GH_FAST_SPAWN=0 to turn off.
+    gh_fast_spawn: bool = _env_flag("OPENX_GH_FAST_SPAWN")
+    # On-disk architecture summary cache; set OPENX_ARCH_CACHE=0 to turn off.
+    arch_cache: bool = _env_flag("OPENX_ARCH_CACHE")
+
+    def __post_init__(self) -> None:
+        if self.github_base_url:
+            parsed = urlparse(self.github_base_url)
+            if parsed.scheme not in ("http", "https") or not parsed.hostname:
+                raise ValueError(
+                    f"GITHUB_BASE_URL must be an http(s) URL, got {self.github_base_url!r}"
+                )
 
 
 settings = Settings()
@@ -2,64 +2,150 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import re
+import shlex
 import subprocess
 import threading
-
+from functools import lru_cache, partial
 from typing import Any, Callable, TypeVar
+from urllib.parse import urlparse
+
+import orjson
 
+from . import cache as _cache
 from .config import settings
 
 T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 _GH_TIMEOUT = 30
+_DIFF_LIMIT = 50000  # characters of `gh pr diff` output kept
+# Python's own fds are non-inheritable (PEP 446), so on POSIX the child needs no
+# fd-closing pass; skipping it also lets subprocess use vfork/posix_spawn.
+_CLOSE_FDS = not (settings.gh_fast_spawn and os.name == "posix")
 
-_gh_env_cache: dict[str, str] | None = None
-_gh_env_cache_key: tuple[str | None, str | None] = (None, None)
-_gh_env_lock = threading.Lock()
+# --json field lists, built once instead of per call.
+_REPO_LIST_FIELDS = "nameWithOwner,isPrivate,defaultBranchRef,url"
+_PR_LIST_FIELDS = "number,title,author,state,url"
+_PR_LIST_CI_FIELDS = f"{_PR_LIST_FIELDS},statusCheckRollup"
+_PR_VIEW_FIELDS = "number,title,body,state,author,url,headRefName,baseRefName,headRefOid"
+_ISSUE_LIST_FIELDS = "number,title,state,author,url,labels"
+_ISSUE_VIEW_FIELDS = "number,title,body,state,author,url,labels"
+_REPO_LIST_ARGS = ("repo", "list", "--limit", "100", "--json", _REPO_LIST_FIELDS)
+_CI_FAILED_CONCLUSIONS = frozenset({"FAILURE", "ERROR", "CANCELLED", "TIMED_OUT"})
+
+# ((token, base_url), env), swapped in as one tuple so readers never see a key
+# paired with another key's env. Building env is cheap and idempotent, so racing
+# first callers just build it twice instead of taking a lock.
+_gh_env_cache: tuple[tuple[str | None, str | None], dict[str, str]] | None = None
 
 def _gh_env() -> dict[str, str]:
-    global _gh_env_cache, _gh_env_cache_key
+    global _gh_env_cache
     key = (settings.github_token, settings.github_base_url)
-    if _gh_env_cache is not None and _gh_env_cache_key == key:
-        return _gh_env_cache
-    with _gh_env_lock:
-        if _gh_env_cache is not None and _gh_env_cache_key == key:
-            return _gh_env_cache
-        env = {**os.environ}
-        if settings.github_token:
-            env["GH_TOKEN"] = settings.github_token
-        if settings.github_base_url:
-            from urllib.parse import urlparse
-            parsed = urlparse(settings.github_base_url)
-            if parsed.hostname:
-                env["GH_HOST"] = parsed.hostname
-        _gh_env_cache = env
-        _gh_env_cache_key = key
-    return _gh_env_cache
-
-def _run_gh(*args: str, timeout: int = _GH_TIMEOUT) -> str | None:
-    """Run gh with args; return stdout or None on failure."""
+    cached = _gh_env_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    env = os.environ.copy()
+    if settings.github_token:
+        env["GH_TOKEN"] = settings.github_token
+    if settings.github_base_url:
+        parsed = urlparse(settings.github_base_url)
+        if parsed.hostname:
+            env["GH_HOST"] = parsed.hostname
+    _gh_env_cache = (key, env)
+    return env
+
+def _run_gh(*args: str, timeout: int = _GH_TIMEOUT) -> bytes | None:
+    """Run gh with args; return raw stdout or None on failure.
+
+    Callers parse it as JSON, which orjson reads from bytes, so stdout is never decoded.
+    """
     try:
         r = subprocess.run(
             ["gh", *args],
             capture_output=True,
-            text=True,
             timeout=timeout,
             env=_gh_env(),
+            close_fds=_CLOSE_FDS,
         )
         if r.returncode != 0:
-            logger.debug("gh %s failed (rc=%d): %s", " ".join(args), r.returncode, (r.stderr or "").strip())
+            # gh failures are routine (callers fall back to the API); only build
+            # the joined command line when debug logging will actually emit it.
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "gh %s failed (rc=%d): %s",
+                    " ".join(args), r.returncode, r.stderr.decode(errors="replace").strip(),
+                )
             return None
-        return (r.stdout or "").strip()
+        return r.stdout.strip()
     except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as exc:
-        logger.debug("gh %s exception: %s", " ".join(args), exc)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("gh %s exception: %s", " ".join(args), exc)
         return None
 
+def _spawn_gh(*args: str) -> subprocess.Popen[bytes] | None:
+    """Start gh with stdout piped, without waiting for it; None if it cannot start."""
+    try:
+        return subprocess.Popen(
+            ["gh", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=_gh_env(),
+            close_fds=_CLOSE_FDS,
+        )
+    except OSError as exc:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("gh %s exception: %s", " ".join(args), exc)
+        return None
+
+def _read_head(proc: subprocess.Popen[bytes], args: tuple[str, ...], limit: int, timeout: int) -> str | None:
+    """Return at most *limit* characters of *proc*'s stdout, or None on failure.
+
+    Reads no more than 4 bytes per character (the UTF-8 maximum), then kills gh,
+    so memory stays bounded however large the output is. Cut-short output counts
+    as success.
+    """
+    max_bytes = 4 * limit
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        with proc.stdout:
+            buf = proc.stdout.read(max_bytes + 1)
+        complete = len(buf) <= max_bytes
+        if not complete:
+            proc.kill()
+        rc = proc.wait()
+    finally:
+        timer.cancel()
+    if complete and rc != 0:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("gh %s failed (rc=%d)", " ".join(args), rc)
+        return None
+    text = buf.decode("utf-8", errors="replace")
+    return (text.strip() if complete else text.lstrip())[:limit]
+
+def _discard(proc: subprocess.Popen[bytes]) -> None:
+    """Kill a spawned gh whose output is no longer wanted and reap it."""
+    proc.kill()
+    proc.stdout.close()
+    proc.wait()
+
+def _loads(out: bytes) -> Any:
+    """Decode gh JSON output with orjson; ``None`` if it is not valid JSON."""
+    try:
+        return orjson.loads(out)
+    except orjson.JSONDecodeError:
+        return None
+
+def _run_gh_cached(*args: str, timeout: int = _GH_TIMEOUT) -> bytes | None:
+    """``_run_gh`` for list commands; output is reused for ``cache.CACHE_TTL_GH`` seconds.
+
+    Writes through github_client or gh clear the cache (``cache.clear_gh_cache``).
+    """
+    return _cache.cached_gh(args, partial(_run_gh, *args, timeout=timeout))
+
 _gh_available: bool | None = None
 _gh_available_lock = threading.Lock()
 
@@ -82,6 +168,7 @@ def available() -> bool:
                 text=True,
                 timeout=5,
                 env=_gh_env(),
+                close_fds=_CLOSE_FDS,
             )
             out = (r.stdout or "") + (r.stderr or "")
             _gh_available = r.returncode == 0 and ("Logged in" in out or "logged in" in out)
@@ -91,15 +178,11 @@ def available() -> bool:
 
 def list_repos(org: str | None = None) -> list[dict[str, Any]] | None:
     """List repos via gh. Returns same shape as github_client.list_repos or None to fall back."""
-    args = ["repo", "list", "--limit", "100", "--json", "nameWithOwner,isPrivate,defaultBranchRef,url"]
-    if org:
-        args.extend([org])
-    out = _run_gh(*args)
+    out = _run_gh_cached(*_REPO_LIST_ARGS, org) if org else _run_gh_cached(*_REPO_LIST_ARGS)
     if not out:
         return None
-    try:
-        data = json.loads(out)
-    except json.JSONDecodeError:
+    data = _loads(out)
+    if data is None:
         return None
     result = []
     for r in data:
@@ -116,12 +199,25 @@ def list_repos(org: str | None = None) -> list[dict[str, Any]] | None:
         })
     return result
 
+def _rollup_status(statuses: list[Any]) -> str:
+    """Overall CI status from a statusCheckRollup list, in one pass: 'failure' | 'success' | 'pending'."""
+    all_success = True
+    for s in statuses:
+        conclusion = s.get("conclusion") if isinstance(s, dict) else None
+        if not conclusion:
+            continue
+        if conclusion in _CI_FAILED_CONCLUSIONS:
+            return "failure"
+        if conclusion != "SUCCESS":
+            all_success = False
+    return "success" if all_success else "pending"
+
 def list_open_prs(repo_full_name: str, include_ci_status: bool = False) -> list[dict[str, Any]] | None:
     """List open PRs via gh. include_ci_status: if True we still skip (use API fallback for CI)."""
-    json_fields = "number,title,author,state,url"
-    if include_ci_status:
-        json_fields += ",statusCheckRollup"
-    out = _run_gh(
+    # CI rollups change while checks run, so only the plain listing is cached.
+    run = _run_gh if include_ci_status else _run_gh_cached
+    json_fields = _PR_LIST_CI_FIELDS if include_ci_status else _PR_LIST_FIELDS
+    out = run(
         "pr", "list",
         "--repo", repo_full_name,
         "--state", "open",
@@ -130,9 +226,8 @@ def list_open_prs(repo_full_name: str, include_ci_status: bool = False) -> list[
     )
     if not out:
         return None
-    try:
-        data = json.loads(out)
-    except json.JSONDecodeError:
+    data = _loads(out)
+    if data is None:
         return None
     result = []
     for pr in data:
@@ -146,36 +241,35 @@ def list_open_prs(repo_full_name: str, include_ci_status: bool = False) -> list[
             "html_url": pr.get("url", ""),
         }
         if include_ci_status and "statusCheckRollup" in pr:
-            statuses = pr.get("statusCheckRollup") or []
-            conclusions = [s.get("conclusion") for s in statuses if isinstance(s, dict) and s.get("conclusion")]
-            if any(c in ("FAILURE", "ERROR", "CANCELLED", "TIMED_OUT") for c in conclusions):
-                entry["ci_status"] = "failure"
-            elif all(c == "SUCCESS" for c in conclusions):
-                entry["ci_status"] = "success"
-            else:
-                entry["ci_status"] = "pending"
+            entry["ci_status"] = _rollup_status(pr.get("statusCheckRollup") or [])
         result.append(entry)
     return result
 
 def get_pr(repo_full_name: str, number: int) -> dict[str, Any] | None:
-    """Get PR details via gh. Returns same shape as github_client.get_pr (best effort)."""
+    """Get PR details via gh. Returns same shape as github_client.get_pr (best effort).
+
+    GraphQL has no diff field, so ``pr view`` and ``pr diff`` stay two gh
+    processes, but the diff is started first and runs while ``pr view`` does.
+    """
+    diff_args = ("pr", "diff", str(number), "--repo", repo_full_name)
+    diff_proc = _spawn_gh(*diff_args)
     out = _run_gh(
         "pr", "view", str(number),
         "--repo", repo_full_name,
-        "--json", "number,title,body,state,author,url,headRefName,baseRefName,headRefOid",
+        "--json", _PR_VIEW_FIELDS,
         timeout=20,
     )
-    if not out:
-        return None
-    try:
-        pr = json.loads(out)
-    except json.JSONDecodeError:
+    pr = _loads(out) if out else None
+    if pr is None:
+        if diff_proc is not None:
+            _discard(diff_proc)
         return None
     author = pr.get("author") or {}
     login = author.get("login", "") if isinstance(author, dict) else ""
 
-    diff_out = _run_gh("pr", "diff", str(number), "--repo", repo_full_name, timeout=25)
-    diff_text = (diff_out or "")[:50000]
+    diff_text = (
+        _read_head(diff_proc, diff_args, limit=_DIFF_LIMIT, timeout=25) if diff_proc is not None else None
+    ) or ""
 
     return {
         "number": pr.get("number"),
@@ -194,18 +288,17 @@ def get_pr(repo_full_name: str, number: int) -> dict[str, Any] | None:
 
 def list_issues(repo_full_name: str, state: str = "open") -> list[dict[str, Any]] | None:
     """List issues via gh."""
-    out = _run_gh(
+    out = _run_gh_cached(
         "issue", "list",
         "--repo", repo_full_name,
         "--state", state,
         "--limit", "100",
-        "--json", "number,title,state,author,url,labels",
+        "--json", _ISSUE_LIST_FIELDS,
     )
     if not out:
         return None
-    try:
-        data = json.loads(out)
-    except json.JSONDecodeError:
+    data = _loads(out)
+    if data is None:
         return None
     result = []
     for i in data:
@@ -228,13 +321,12 @@ def get_issue(repo_full_name: str, number: int) -> dict[str, Any] | None:
     out = _run_gh(
         "issue", "view", str(number),
         "--repo", repo_full_name,
-        "--json", "number,title,body,state,author,url,labels",
+        "--json", _ISSUE_VIEW_FIELDS,
     )
     if not out:
         return None
-    try:
-        i = json.loads(out)
-    except json.JSONDecodeError:
+    i = _loads(out)
+    if i is None:
         return None
     author = i.get("author") or {}
     login = author.get("login") if isinstance(author, dict) else None
@@ -252,6 +344,26 @@ def get_issue(repo_full_name: str, number: int) -> dict[str, Any] | None:
 
 # Allowed first-level gh subcommands for run_gh_command (avoids auth, config, etc.).
 _ALLOWED_GH_SUBCOMMANDS = frozenset({"pr", "issue", "repo", "run", "workflow", "api"})
+# Second-level actions that only read; anything else may write and clears the gh cache.
+_GH_READ_ACTIONS = frozenset({"list", "view", "diff", "checks", "status", "watch", "download"})
+# gh api sends POST as soon as any field or input is given.
+_GH_API_WRITE_FLAGS = ("-f", "-F", "--field", "--raw-field", "--input")
+
+def _is_read_only(parts: list[str]) -> bool:
+    if parts[0].lower() != "api":
+        return len(parts) > 1 and parts[1].lower() in _GH_READ_ACTIONS
+    for i, arg in enumerate(parts):
+        if arg.startswith(_GH_API_WRITE_FLAGS):
+            return False
+        if arg in ("-X", "--method"):
+            method = parts[i + 1] if i + 1 < len(parts) else ""
+        elif arg.startswith(("--method=", "-X")):
+            method = arg.split("=", 1)[1] if "=" in arg else arg[2:]
+        else:
+            continue
+        if method.upper() not in ("GET", "HEAD"):
+            return False
+    return True
 
 def _run_gh_capture_both(*args: str, timeout: int = _GH_TIMEOUT) -> str | None:
     """Run gh; return combined stdout + stderr or None on failure (so we can parse URL from either stream)."""
@@ -262,17 +374,29 @@ def _run_gh_capture_both(*args: str, timeout: int = _GH_TIMEOUT) -> str | None:
             text=True,
             timeout=timeout,
             env=_gh_env(),
+            close_fds=_CLOSE_FDS,
         )
         if r.returncode != 0:
-            logger.debug("gh %s failed (rc=%d): %s", " ".join(args), r.returncode, (r.stderr or "").strip())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("gh %s failed (rc=%d): %s", " ".join(args), r.returncode, (r.stderr or "").strip())
             return None
         return ((r.stdout or "") + " " + (r.stderr or "")).strip() or None
     except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as exc:
-        logger.debug("gh %s exception: %s", " ".join(args), exc)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("gh %s exception: %s", " ".join(args), exc)
         return None
 _ISSUE_URL_RE = re.compile(r"(https?://[^\s/]+/[^/]+/[^/]+/issues/(\d+))")
 _PULL_URL_RE = re.compile(r"(https?://[^\s/]+/[^/]+/[^/]+/pull/(\d+))")
 
+def _find_url(out: str, pattern: re.Pattern[str], marker: str) -> re.Match[str] | None:
+    """Match *pattern* on the first line holding *marker*; gh prints the new URL on its own line."""
+    for line in out.splitlines():
+        if marker in line and "://" in line:
+            m = pattern.search(line)
+            if m:
+                return m
+    return None
+
 def create_issue(repo_full_name: str, title: str, body: str = "", labels: list[str] | None = None) -> dict[str, Any] | None:
     """Create an issue via gh. Returns dict with number, title, state, html_url or None on failure."""
     args = ["issue", "create", "--repo", repo_full_name, "--title", title]
@@ -286,7 +410,8 @@ def create_issue(repo_full_name: str, title: str, body: str = "", labels: list[s
     out = _run_gh_capture_both(*args, timeout=15)
     if not out:
         return None
-    m = _ISSUE_URL_RE.search(out)
+    _cache.clear_gh_cache()
+    m = _find_url(out, _ISSUE_URL_RE, "/issues/")
     if not m:
         return None  # No parseable URL; fall back to API
     url, number_str = m.group(1), m.group(2)
@@ -315,31 +440,45 @@ def create_pr(
     out = _run_gh_capture_both(*args, timeout=20)
     if not out:
         return None
-    m = _PULL_URL_RE.search(out)
+    _cache.clear_gh_cache()
+    m = _find_url(out, _PULL_URL_RE, "/pull/")
     if not m:
         return None  # No parseable URL; fall back to API
     url, number_str = m.group(1), m.group(2)
     number = int(number_str)
     return {"number": number, "title": title, "state": "open", "html_url": url}
 
+@lru_cache(maxsize=256)
+def _split_command(command: str) -> tuple[str, ...]:
+    """Shell-style split, so quoted arguments such as ``--body "two words"`` stay whole."""
+    try:
+        return tuple(shlex.split(command))
+    except ValueError as exc:  # unbalanced quotes
+        raise ValueError(f"Invalid gh command: {exc}") from None
+
 def run_gh_command(command: str, timeout: int = 25) -> str:
     """Run a gh CLI command string (e.g. 'pr list --repo owner/repo'). Returns combined stdout and stderr.
     Only allowed subcommands: pr, issue, repo, run, workflow, api. Raises ValueError if disallowed or empty.
     """
-    parts = [p.strip() for p in command.split() if p.strip()]
+    parts = _split_command(command)
     if not parts:
         raise ValueError("Empty gh command")
     sub = parts[0].lower()
     if sub not in _ALLOWED_GH_SUBCOMMANDS:
         raise ValueError(f"Subcommand not allowed: {sub}. Allowed: {', '.join(sorted(_ALLOWED_GH_SUBCOMMANDS))}")
     try:
-        r = subprocess.run(
-            ["gh", *parts],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            env=_gh_env(),
-        )
+        try:
+            r = subprocess.run(
+                ["gh", *parts],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                env=_gh_env(),
+                close_fds=_CLOSE_FDS,
+            )
+        finally:
+            if not _is_read_only(parts):
+                _cache.clear_gh_cache()
         out = (r.stdout or "").strip()
         err = (r.stderr or "").strip()
         if r.returncode != 0 and err:
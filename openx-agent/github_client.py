@@ -5,14 +5,18 @@ import difflib
 import io
 import json
 import logging
+import random
 import re
 import threading
+import time
 import zipfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import lru_cache
+from functools import lru_cache, partial
 from typing import Any
 from urllib.parse import quote
 
+import anyio
+import anyio.to_thread
 import httpx
 
 from .config import settings
@@ -26,22 +30,37 @@ _CHECK_CONCLUSION_FAILED = frozenset({
 
 _github_client: Any = None
 _github_client_lock = threading.Lock()
+_GITHUB_POOL_SIZE = 20
+_GITHUB_PER_PAGE = 100
+# Size caps for PR payloads returned to the client.
+_PATCH_LIMIT = 12000  # per changed file
+_DIFF_LIMIT = 50000  # whole PR diff
+_REASON_LIMIT = 400  # unclassified CI failure: tail of the log
+_NO_FIX_REASON_LIMIT = 300  # reason echoed back when heal_failing_pr has no patch
 
 def _client() -> Any:
-    """Return a single shared PyGithub client (thread-safe, lazy init)."""
+    """Return a single shared PyGithub client (thread-safe, lazy init).
+
+    The client owns one urllib3 connection pool sized for the tool thread
+    fan-out, so every helper reuses warm keep-alive connections.
+    """
     global _github_client
     if _github_client is not None:
         return _github_client
     with _github_client_lock:
         if _github_client is not None:
             return _github_client
-        from github import Github
+        from github import Auth, Github
         if not settings.github_token:
             raise RuntimeError("GITHUB_TOKEN is required for GitHub operations")
+        kwargs: dict[str, Any] = {
+            "auth": Auth.Token(settings.github_token),
+            "pool_size": _GITHUB_POOL_SIZE,
+            "per_page": _GITHUB_PER_PAGE,
+        }
         if settings.github_base_url:
-            _github_client = Github(base_url=settings.github_base_url, login_or_token=settings.github_token)
-        else:
-            _github_client = Github(login_or_token=settings.github_token)
+            kwargs["base_url"] = settings.github_base_url
+        _github_client = Github(**kwargs)
     return _github_client
 
 _http_client: httpx.Client | None = None
@@ -55,20 +74,36 @@ def _get_http_client() -> httpx.Client:
     with _http_client_lock:
         if _http_client is not None:
             return _http_client
-        _http_client = httpx.Client(timeout=60, follow_redirects=True)
+        _http_client = httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            follow_redirects=True,
+        )
     return _http_client
 
 def get_repo(full_name: str) -> Any:
     return _client().get_repo(full_name)
 
 def _ci_status_from_check_runs(runs: list[dict[str, Any]]) -> str:
-    """Derive overall CI status from check_runs list. Returns 'failure' | 'success' | 'pending'."""
-    conclusions = [c.get("conclusion") for c in runs if c.get("conclusion")]
-    if any(c in _CHECK_CONCLUSION_FAILED for c in conclusions):
-        return "failure"
-    if all(c == "success" for c in conclusions):
-        return "success"
-    return "pending"
+    """Derive overall CI status from check_runs list. Returns 'failure' | 'success' | 'pending'.
+
+    One pass: any failed conclusion wins at once; runs without a conclusion are ignored.
+    """
+    all_success = True
+    for run in runs:
+        conclusion = run.get("conclusion")
+        if not conclusion:
+            continue
+        if conclusion in _CHECK_CONCLUSION_FAILED:
+            return "failure"
+        if conclusion != "success":
+            all_success = False
+    return "success" if all_success else "pending"
+
+def _truncate(text: str, limit: int) -> str:
+    """Return *text* cut to *limit* characters; short strings are returned without a copy."""
+    return text if len(text) <= limit else text[:limit]
 
 @lru_cache(maxsize=1)
 def _api_base_url() -> str:
@@ -127,12 +162,154 @@ def _api_request(method: str, path: str, *, json_body: dict[str, Any] | None = N
     resp.raise_for_status()
     return resp
 
+def _pick(obj: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+    return {f: obj.get(f) for f in fields}
+
+def _api_get_page(url: str, fields: tuple[str, ...], key: str | None = None) -> tuple[Any, str | None]:
+    """GET *url* and return ``(payload, next_url)``, revalidating a seen response with If-None-Match.
+
+    The payload keeps only *fields* of the object, or of each item in its *key*
+    list; only that projection is cached, since a page of runs embeds full
+    repository objects. GitHub answers unchanged resources with ``304 Not
+    Modified``, which does not count against the primary rate limit and
+    carries no body, so the ``rel="next"`` link is cached alongside.
+    """
+    cached = _cache.etag_lookup(url)
+    headers = _api_headers({"If-None-Match": cached[0]}) if cached else _api_headers()
+    resp = _get_http_client().get(url, headers=headers)
+    if resp.status_code == 304 and cached:
+        return cached[1]
+    resp.raise_for_status()
+    data = resp.json()
+    payload = [_pick(item, fields) for item in data.get(key, [])] if key else _pick(data, fields)
+    page = (payload, resp.links.get("next", {}).get("url"))
+    etag = resp.headers.get("ETag")
+    if etag:
+        _cache.etag_store(url, etag, page)
+    return page
+
+def _api_get_json(path: str, fields: tuple[str, ...]) -> dict[str, Any]:
+    """GET one object at *path*, keeping *fields*, with ETag revalidation."""
+    return _api_get_page(f"{_api_base_url()}{path}", fields)[0]
+
+def _api_get_all(path: str, key: str, fields: tuple[str, ...], max_pages: int | None = None) -> list[dict[str, Any]]:
+    """Concatenate the *key* list of each page of *path*, following ``Link: rel="next"``."""
+    items: list[dict[str, Any]] = []
+    url: str | None = f"{_api_base_url()}{path}"
+    pages = 0
+    while url and (max_pages is None or pages < max_pages):
+        batch, url = _api_get_page(url, fields, key)
+        items.extend(batch)
+        pages += 1
+    return items
+
+@lru_cache(maxsize=1)
+def _graphql_url() -> str:
+    """GraphQL endpoint: api.github.com/graphql, or <host>/api/graphql on GHES."""
+    base = _api_base_url()
+    if base.endswith("/v3"):
+        return f"{base[:-3]}/graphql"
+    return f"{base}/graphql"
+
+def _graphql_nodes(query: str, variables: dict[str, Any], path: tuple[str, ...]) -> list[dict[str, Any]]:
+    """Run a paginated GraphQL query and return every node of the connection at *path*.
+
+    The query must take a ``$cursor`` variable and select ``nodes`` and
+    ``pageInfo { endCursor hasNextPage }`` on the connection.
+    """
+    client = _get_http_client()
+    nodes: list[dict[str, Any]] = []
+    cursor: str | None = None
+    while True:
+        resp = client.post(
+            _graphql_url(),
+            headers=_api_headers(),
+            json={"query": query, "variables": {**variables, "cursor": cursor}},
+        )
+        resp.raise_for_status()
+        payload = resp.json()
+        if payload.get("errors"):
+            raise RuntimeError(f"GraphQL error: {payload['errors'][0].get('message', payload['errors'])}")
+        conn = payload.get("data") or {}
+        for key in path:
+            conn = conn.get(key) or {}
+        nodes.extend(conn.get("nodes") or [])
+        page = conn.get("pageInfo") or {}
+        if not page.get("hasNextPage"):
+            return nodes
+        cursor = page.get("endCursor")
+
+_REPO_FIELDS = "nodes { nameWithOwner isPrivate url defaultBranchRef { name } } pageInfo { endCursor hasNextPage }"
+_GQL_VIEWER_REPOS = (
+    "query($cursor: String) { viewer { repositories(first: 100, after: $cursor, "
+    "ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]) { " + _REPO_FIELDS + " } } }"
+)
+_GQL_ORG_REPOS = (
+    "query($org: String!, $cursor: String) { organization(login: $org) { "
+    "repositories(first: 100, after: $cursor) { " + _REPO_FIELDS + " } } }"
+)
+_GQL_OPEN_PRS = (
+    "query($owner: String!, $name: String!, $cursor: String) { repository(owner: $owner, name: $name) { "
+    "pullRequests(first: 100, after: $cursor, states: OPEN, orderBy: {field: CREATED_AT, direction: DESC}) { "
+    "nodes { number title state url author { login }%s } pageInfo { endCursor hasNextPage } } } }"
+)
+_GQL_PR_ROLLUP = " commits(last: 1) { nodes { commit { statusCheckRollup { state } } } }"
+
+def _graphql_list_repos(org: str | None) -> list[dict[str, Any]]:
+    if org is None:
+        nodes = _graphql_nodes(_GQL_VIEWER_REPOS, {}, ("viewer", "repositories"))
+    else:
+        nodes = _graphql_nodes(_GQL_ORG_REPOS, {"org": org}, ("organization", "repositories"))
+    return [
+        {
+            "full_name": n.get("nameWithOwner", ""),
+            "private": n.get("isPrivate", False),
+            "default_branch": (n.get("defaultBranchRef") or {}).get("name") or "main",
+            "html_url": n.get("url", ""),
+        }
+        for n in nodes
+    ]
+
+def _rollup_ci_status(pr_node: dict[str, Any]) -> str:
+    commits = (pr_node.get("commits") or {}).get("nodes") or []
+    rollup = ((commits[0].get("commit") or {}).get("statusCheckRollup") or {}) if commits else {}
+    state = (rollup.get("state") or "").upper()
+    if state in ("FAILURE", "ERROR"):
+        return "failure"
+    if state == "SUCCESS":
+        return "success"
+    return "pending"
+
+def _graphql_list_open_prs(
+    repo_full_name: str, include_ci_status: bool, ci_status_max: int
+) -> list[dict[str, Any]]:
+    owner, _, name = repo_full_name.partition("/")
+    query = _GQL_OPEN_PRS % (_GQL_PR_ROLLUP if include_ci_status else "")
+    nodes = _graphql_nodes(query, {"owner": owner, "name": name}, ("repository", "pullRequests"))
+    out: list[dict[str, Any]] = []
+    for i, n in enumerate(nodes):
+        entry: dict[str, Any] = {
+            "number": n.get("number"),
+            "title": n.get("title", ""),
+            "user": (n.get("author") or {}).get("login", ""),
+            "state": (n.get("state") or "open").lower(),
+            "html_url": n.get("url", ""),
+        }
+        if include_ci_status and i < ci_status_max:
+            entry["ci_status"] = _rollup_ci_status(n)
+        out.append(entry)
+    return out
+
 def list_repos(org: str | None = None) -> list[dict[str, Any]]:
     def _fetch():
         if gh_cli.available():
             result = gh_cli.list_repos(org)
             if result is not None:
                 return result
+        try:
+            return _graphql_list_repos(org)
+        except Exception as exc:
+            logger.debug("GraphQL list_repos failed, falling back to REST: %s", exc)
         gh = _client()
         repos = gh.get_user().get_repos() if org is None else gh.get_organization(org).get_repos()
         return [
@@ -142,6 +319,18 @@ def list_repos(org: str | None = None) -> list[dict[str, Any]]:
     cache_key = f"list_repos:{org or 'user'}"
     return _cache.cached_list(cache_key, _cache.CACHE_TTL_LIST, _fetch)
 
+def _commit_ci_status(repo_full_name: str, sha: str) -> str:
+    """CI state of one commit from its check runs, else its combined status."""
+    try:
+        checks_resp = _api_request("GET", f"/repos/{repo_full_name}/commits/{sha}/check-runs")
+        runs = checks_resp.json().get("check_runs", [])
+        if runs:
+            return _ci_status_from_check_runs(runs)
+        status_resp = _api_request("GET", f"/repos/{repo_full_name}/commits/{sha}/status")
+        return status_resp.json().get("state") or "pending"
+    except Exception:
+        return "unknown"
+
 def list_open_prs(
     repo_full_name: str,
     include_ci_status: bool = False,
@@ -154,32 +343,30 @@ def list_open_prs(
             result = gh_cli.list_open_prs(repo_full_name, include_ci_status)
             if result is not None:
                 return result
+        try:
+            return _graphql_list_open_prs(repo_full_name, include_ci_status, ci_status_max)
+        except Exception as exc:
+            logger.debug("GraphQL list_open_prs failed, falling back to REST: %s", exc)
         repo = get_repo(repo_full_name)
         prs = repo.get_pulls(state="open")
         out_inner: list[dict[str, Any]] = []
+        head_shas: list[str] = []
         for i, pr in enumerate(prs):
-            entry: dict[str, Any] = {
+            out_inner.append({
                 "number": pr.number,
                 "title": pr.title,
                 "user": pr.user.login,
                 "state": pr.state,
                 "html_url": pr.html_url,
-            }
+            })
             if include_ci_status and i < ci_status_max:
-                try:
-                    checks_resp = _api_request(
-                        "GET",
-                        f"/repos/{repo_full_name}/commits/{pr.head.sha}/check-runs",
-                    )
-                    runs = checks_resp.json().get("check_runs", [])
-                    if runs:
-                        entry["ci_status"] = _ci_status_from_check_runs(runs)
-                    else:
-                        status_resp = _api_request("GET", f"/repos/{repo_full_name}/commits/{pr.head.sha}/status")
-                        entry["ci_status"] = status_resp.json().get("state") or "pending"
-                except Exception:
-                    entry["ci_status"] = "unknown"
-            out_inner.append(entry)
+                head_shas.append(pr.head.sha)
+        if head_shas:
+            # One thread per PR, as in get_failing_prs: the status round trips overlap.
+            with ThreadPoolExecutor(max_workers=min(len(head_shas), 8), thread_name_prefix="ci_status") as pool:
+                statuses = pool.map(partial(_commit_ci_status, repo_full_name), head_shas)
+                for entry, status in zip(out_inner, statuses):
+                    entry["ci_status"] = status
         return out_inner
 
     if not include_ci_status:
@@ -202,11 +389,15 @@ def get_pr(repo_full_name: str, number: int) -> dict[str, Any]:
 
         files_changed = []
         combined_patch = []
+        # Stop building the diff once it is past _DIFF_LIMIT; later patches would be cut anyway.
+        combined_len = 0
         try:
             for f in pr.get_files():
-                patch = (f.patch or "")[:12000]
-                if patch:
-                    combined_patch.append(f"--- a/{f.filename}\n+++ b/{f.filename}\n{patch}")
+                patch = _truncate(f.patch or "", _PATCH_LIMIT)
+                if patch and combined_len <= _DIFF_LIMIT:
+                    chunk = f"--- a/{f.filename}\n+++ b/{f.filename}\n{patch}"
+                    combined_patch.append(chunk)
+                    combined_len += len(chunk) + 1
                 files_changed.append({
                     "filename": f.filename,
                     "status": f.status,
@@ -217,7 +408,7 @@ def get_pr(repo_full_name: str, number: int) -> dict[str, Any]:
         except Exception:
             pass
 
-        diff_text = "\n".join(combined_patch)[:50000] if combined_patch else ""
+        diff_text = _truncate("\n".join(combined_patch), _DIFF_LIMIT) if combined_patch else ""
         if not diff_text:
             try:
                 resp = _get_http_client().get(
@@ -226,7 +417,7 @@ def get_pr(repo_full_name: str, number: int) -> dict[str, Any]:
                     timeout=30,
                 )
                 if resp.status_code == 200 and resp.text:
-                    diff_text = resp.text[:50000]
+                    diff_text = _truncate(resp.text, _DIFF_LIMIT)
             except Exception:
                 pass
 
@@ -272,12 +463,14 @@ def comment_pr(repo_full_name: str, number: int, body: str) -> dict[str, Any]:
     repo = get_repo(repo_full_name)
     pr = repo.get_pull(number)
     comment = pr.create_issue_comment(body)
+    _cache.clear_gh_cache()
     return {"id": comment.id, "html_url": comment.html_url}
 
 def merge_pr(repo_full_name: str, number: int, method: str = "merge") -> dict[str, Any]:
     repo = get_repo(repo_full_name)
     pr = repo.get_pull(number)
     result = pr.merge(merge_method=method)
+    _cache.clear_gh_cache()
     return {"merged": result.merged, "message": result.message}
 
 def create_pull(
@@ -302,6 +495,7 @@ def create_pull(
     try:
         repo = get_repo(repo_full_name)
         pr = repo.create_pull(title=title, body=body or None, head=head, base=base)
+        _cache.clear_gh_cache()
         web_base = _web_base_url()
         html_url = f"{web_base}/{repo_full_name}/pull/{pr.number}"
         return {
@@ -420,6 +614,7 @@ def create_issue(
     try:
         repo = get_repo(repo_full_name)
         issue = repo.create_issue(title=title, body=body or None, labels=labels or [])
+        _cache.clear_gh_cache()
         web_base = _web_base_url()
         html_url = f"{web_base}/{repo_full_name}/issues/{issue.number}"
         return {
@@ -437,6 +632,7 @@ def comment_issue(repo_full_name: str, number: int, body: str) -> dict[str, Any]
     repo = get_repo(repo_full_name)
     issue = repo.get_issue(number)
     comment = issue.create_comment(body)
+    _cache.clear_gh_cache()
     return {"id": comment.id, "html_url": comment.html_url}
 
 def close_issue(repo_full_name: str, number: int) -> dict[str, Any]:
@@ -444,21 +640,16 @@ def close_issue(repo_full_name: str, number: int) -> dict[str, Any]:
     repo = get_repo(repo_full_name)
     issue = repo.get_issue(number)
     issue.edit(state="closed")
+    _cache.clear_gh_cache()
     return {"number": issue.number, "state": "closed"}
 
+_WORKFLOW_FIELDS = ("id", "name", "path", "state", "html_url")
+_RUN_FIELDS = ("id", "name", "status", "conclusion", "html_url", "created_at")
+_RUN_DETAIL_FIELDS = (*_RUN_FIELDS, "updated_at")
+
 def list_workflows(repo_full_name: str) -> list[dict[str, Any]]:
-    repo = get_repo(repo_full_name)
-    workflows = repo.get_workflows()
-    return [
-        {
-            "id": wf.id,
-            "name": wf.name,
-            "path": wf.path,
-            "state": wf.state,
-            "html_url": wf.html_url,
-        }
-        for wf in workflows
-    ]
+    """List Actions workflows with conditional REST calls, 100 per page (not exposed via GraphQL)."""
+    return _api_get_all(f"/repos/{repo_full_name}/actions/workflows?per_page=100", "workflows", _WORKFLOW_FIELDS)
 
 def trigger_workflow(repo_full_name: str, workflow_id: int, ref: str, inputs: dict[str, Any] | None = None) -> dict[str, Any]:
     repo = get_repo(repo_full_name)
@@ -467,33 +658,76 @@ def trigger_workflow(repo_full_name: str, workflow_id: int, ref: str, inputs: di
     return {"status": "dispatched"}
 
 def list_workflow_runs(repo_full_name: str, workflow_id: int) -> list[dict[str, Any]]:
-    repo = get_repo(repo_full_name)
-    workflow = repo.get_workflow(workflow_id)
-    runs = workflow.get_runs()
-    return [
-        {
-            "id": run.id,
-            "name": run.name,
-            "status": run.status,
-            "conclusion": run.conclusion,
-            "html_url": run.html_url,
-            "created_at": run.created_at.isoformat() if run.created_at else None,
-        }
-        for run in runs
-    ]
+    """List the 100 most recent runs of a workflow with one conditional REST call."""
+    path = f"/repos/{repo_full_name}/actions/workflows/{workflow_id}/runs?per_page=100"
+    return _api_get_all(path, "workflow_runs", _RUN_FIELDS, max_pages=1)
 
 def get_workflow_run(repo_full_name: str, run_id: int) -> dict[str, Any]:
-    repo = get_repo(repo_full_name)
-    run = repo.get_workflow_run(run_id)
-    return {
-        "id": run.id,
-        "name": run.name,
-        "status": run.status,
-        "conclusion": run.conclusion,
-        "html_url": run.html_url,
-        "created_at": run.created_at.isoformat() if run.created_at else None,
-        "updated_at": run.updated_at.isoformat() if run.updated_at else None,
-    }
+    return _api_get_json(f"/repos/{repo_full_name}/actions/runs/{run_id}", _RUN_DETAIL_FIELDS)
+
+_AWAIT_MAX_DELAY = 30.0
+_AWAIT_MAX_TIMEOUT = 3600.0
+
+def _transient_wait(exc: httpx.HTTPError) -> float | None:
+    """Seconds GitHub asks us to wait before retrying *exc*; ``None`` if the error is not transient.
+
+    Transport errors, 5xx, 429 and rate-limit 403s are transient. The wait
+    comes from ``Retry-After``, else ``X-RateLimit-Reset``, else 0.
+    """
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return 0.0 if isinstance(exc, httpx.TransportError) else None
+    headers = exc.response.headers
+    status = exc.response.status_code
+    rate_limited = status == 429 or (
+        status == 403 and ("Retry-After" in headers or headers.get("X-RateLimit-Remaining") == "0")
+    )
+    if not rate_limited and status < 500:
+        return None
+    try:
+        if "Retry-After" in headers:
+            return max(float(headers["Retry-After"]), 0.0)
+        if "X-RateLimit-Reset" in headers:
+            return max(float(headers["X-RateLimit-Reset"]) - time.time(), 0.0)
+    except ValueError:
+        pass
+    return 0.0
+
+async def await_workflow_run(repo_full_name: str, run_id: int, timeout_s: float = 600) -> dict[str, Any]:
+    """Poll a workflow run until it completes or *timeout_s* elapses (capped at one hour).
+
+    Delays grow 1s -> 2s -> 4s ... capped at 30s, each with up to 1s of random
+    jitter so concurrent pollers do not hit the API in lockstep. Transient API
+    failures (see ``_transient_wait``) are retried, waiting at least as long as
+    ``Retry-After`` asks. Only the ``get_workflow_run`` calls run in a worker
+    thread; the waits are ``anyio.sleep``, so no thread is held between polls
+    and cancelling the request stops the loop. On timeout the latest run state
+    is returned with ``timed_out: True``, or the last error is raised if no poll
+    succeeded.
+    """
+    deadline = time.monotonic() + min(max(timeout_s, 0.0), _AWAIT_MAX_TIMEOUT)
+    delay = 1.0
+    run: dict[str, Any] | None = None
+    error: httpx.HTTPError | None = None
+    while True:
+        wait = 0.0
+        try:
+            run = await anyio.to_thread.run_sync(get_workflow_run, repo_full_name, run_id)
+        except httpx.HTTPError as exc:
+            transient_wait = _transient_wait(exc)
+            if transient_wait is None:
+                raise
+            logger.debug("polling workflow run %s failed, retrying: %s", run_id, exc)
+            wait, error = transient_wait, exc
+        else:
+            if run.get("status") == "completed":
+                return run
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if run is None:
+                raise error
+            return {**run, "timed_out": True}
+        await anyio.sleep(min(max(delay + random.random(), wait), remaining))
+        delay = min(delay * 2, _AWAIT_MAX_DELAY)
 
 def _extract_run_id(details_url: str | None) -> int | None:
     if not details_url:
@@ -596,50 +830,55 @@ def get_ci_logs(repo_full_name: str, workflow_run_id: int) -> str:
             chunks.append(f"===== {name} =====\n{raw.strip()}\n")
     return "\n".join(chunks).strip()
 
+_PY_TRACE_RE = re.compile(r'File "([^"]+)", line (\d+)')
+_FILE_HINT_RE = re.compile(
+    r"([A-Za-z0-9_./-]+\.(?:py|js|jsx|ts|tsx|java|go|rb|php|cpp|c|cs|rs|yml|yaml|json))(?::(\d+))?"
+)
+# Checked in order; the first match classifies the failure.
+_CI_ERROR_PATTERNS: tuple[tuple[re.Pattern[str], str], ...] = tuple(
+    (re.compile(pattern, re.MULTILINE), err_type)
+    for pattern, err_type in (
+        (r"ModuleNotFoundError: No module named ['\"]([^'\"]+)['\"]", "missing_dependency"),
+        (r"ImportError: cannot import name ['\"]([^'\"]+)['\"]", "import_error"),
+        (r"SyntaxError:", "syntax_error"),
+        (r"IndentationError:", "indentation_error"),
+        (r"NameError: name ['\"]([^'\"]+)['\"] is not defined", "name_error"),
+        (r"AttributeError:", "attribute_error"),
+        (r"AssertionError:", "test_assertion_failure"),
+        (r"FAILED\s+([^\n]+)", "test_failure"),
+        (r"error Command failed with exit code", "build_failure"),
+        (r"npm ERR!", "npm_failure"),
+        (r"ruff .*Found", "lint_failure"),
+        (r"would reformat", "format_failure"),
+    )
+)
+
 def analyze_ci_failure(logs: str) -> dict[str, str]:
     if not logs.strip():
         return {"error_type": "unknown", "file_hint": "", "reason": "No logs provided"}
 
     file_hint = ""
 
-    py_trace = re.findall(r'File "([^"]+)", line (\d+)', logs)
+    py_trace = _PY_TRACE_RE.findall(logs)
     if py_trace:
         path, line = py_trace[-1]
         file_hint = f"{path}:{line}"
 
     if not file_hint:
-        file_match = re.search(
-            r"([A-Za-z0-9_./-]+\.(?:py|js|jsx|ts|tsx|java|go|rb|php|cpp|c|cs|rs|yml|yaml|json))(?::(\d+))?",
-            logs,
-        )
+        file_match = _FILE_HINT_RE.search(logs)
         if file_match:
             file_hint = file_match.group(1)
             if file_match.group(2):
                 file_hint = f"{file_hint}:{file_match.group(2)}"
 
-    patterns: list[tuple[str, str]] = [
-        (r"ModuleNotFoundError: No module named ['\"]([^'\"]+)['\"]", "missing_dependency"),
-        (r"ImportError: cannot import name ['\"]([^'\"]+)['\"]", "import_error"),
-        (r"SyntaxError:", "syntax_error"),
-        (r"IndentationError:", "indentation_error"),
-        (r"NameError: name ['\"]([^'\"]+)['\"] is not defined", "name_error"),
-        (r"AttributeError:", "attribute_error"),
-        (r"AssertionError:", "test_assertion_failure"),
-        (r"FAILED\s+([^\n]+)", "test_failure"),
-        (r"error Command failed with exit code", "build_failure"),
-        (r"npm ERR!", "npm_failure"),
-        (r"ruff .*Found", "lint_failure"),
-        (r"would reformat", "format_failure"),
-    ]
-
-    for pat, err_type in patterns:
-        match = re.search(pat, logs, re.MULTILINE)
+    for pattern, err_type in _CI_ERROR_PATTERNS:
+        match = pattern.search(logs)
         if match:
             reason = match.group(0).strip()
             return {"error_type": err_type, "file_hint": file_hint, "reason": reason}
 
     tail = "\n".join(logs.strip().splitlines()[-10:])
-    return {"error_type": "unknown", "file_hint": file_hint, "reason": tail[:400]}
+    return {"error_type": "unknown", "file_hint": file_hint, "reason": _truncate(tail, _REASON_LIMIT)}
 
 def _decode_content(encoded: str) -> str:
     return base64.b64decode(encoded).decode("utf-8", errors="replace")
@@ -789,7 +1028,11 @@ def _apply_hunks(original: str, hunks: list[dict[str, Any]]) -> str:
     out.extend(src[src_idx:])
     return "".join(out)
 
-def generate_fix_patch(code_context: Any, error: dict[str, Any]) -> str:
+def generate_fix_patch(code_context: dict[str, Any] | str, error: dict[str, Any]) -> str:
+    """Build a unified diff for *error* from a ``locate_code_context`` result.
+
+    Dicts are used as-is; only a JSON string is parsed.
+    """
     data = code_context
     if isinstance(code_context, str):
         try:
@@ -854,39 +1097,42 @@ def apply_fix_to_pr(repo_full_name: str, pr_number: int, patch: str) -> dict[str
         raise ValueError("Patch did not contain any file changes")
 
     commits: list[dict[str, Any]] = []
-    for file_diff in files:
-        old_path_raw = file_diff["old_path"]
-        new_path_raw = file_diff["new_path"]
-        is_new = old_path_raw == "/dev/null"
-        is_delete = new_path_raw == "/dev/null"
-        target_path = _normalize_patch_path(new_path_raw if not is_delete else old_path_raw)
-
-        current_text = ""
-        current_sha: str | None = None
-        if not is_new:
-            current_obj = repo.get_contents(_normalize_patch_path(old_path_raw), ref=branch)
-            if isinstance(current_obj, list):
-                raise ValueError(f"Expected file but found directory: {old_path_raw}")
-            current_text = _decode_content(current_obj.content)
-            current_sha = current_obj.sha
-
-        updated_text = _apply_hunks(current_text, file_diff["hunks"]) if not is_delete else ""
-        message = f"chore(self-heal): apply AI-generated fix for PR #{pr_number}"
-
-        if is_delete:
-            if not current_sha:
-                raise ValueError(f"File not found for delete: {target_path}")
-            resp = repo.delete_file(target_path, message, current_sha, branch=branch)
-            commits.append({"path": target_path, "commit_sha": resp["commit"].sha, "action": "delete"})
-        elif is_new:
-            resp = repo.create_file(target_path, message, updated_text, branch=branch)
-            commits.append({"path": target_path, "commit_sha": resp["commit"].sha, "action": "create"})
-        else:
-            if not current_sha:
-                raise ValueError(f"File not found for update: {target_path}")
-            resp = repo.update_file(target_path, message, updated_text, current_sha, branch=branch)
-            commits.append({"path": target_path, "commit_sha": resp["commit"].sha, "action": "update"})
-
+    try:
+        for file_diff in files:
+            old_path_raw = file_diff["old_path"]
+            new_path_raw = file_diff["new_path"]
+            is_new = old_path_raw == "/dev/null"
+            is_delete = new_path_raw == "/dev/null"
+            target_path = _normalize_patch_path(new_path_raw if not is_delete else old_path_raw)
+
+            current_text = ""
+            current_sha: str | None = None
+            if not is_new:
+                current_obj = repo.get_contents(_normalize_patch_path(old_path_raw), ref=branch)
+                if isinstance(current_obj, list):
+                    raise ValueError(f"Expected file but found directory: {old_path_raw}")
+                current_text = _decode_content(current_obj.content)
+                current_sha = current_obj.sha
+
+            updated_text = _apply_hunks(current_text, file_diff["hunks"]) if not is_delete else ""
+            message = f"chore(self-heal): apply AI-generated fix for PR #{pr_number}"
+
+            if is_delete:
+                if not current_sha:
+                    raise ValueError(f"File not found for delete: {target_path}")
+                resp = repo.delete_file(target_path, message, current_sha, branch=branch)
+                commits.append({"path": target_path, "commit_sha": resp["commit"].sha, "action": "delete"})
+            elif is_new:
+                resp = repo.create_file(target_path, message, updated_text, branch=branch)
+                commits.append({"path": target_path, "commit_sha": resp["commit"].sha, "action": "create"})
+            else:
+                if not current_sha:
+                    raise ValueError(f"File not found for update: {target_path}")
+                resp = repo.update_file(target_path, message, updated_text, current_sha, branch=branch)
+                commits.append({"path": target_path, "commit_sha": resp["commit"].sha, "action": "update"})
+    finally:
+        if commits:  # even a partial apply changed the branch
+            _cache.clear_gh_cache()
     return {"status": "applied", "branch": branch, "commits": commits}
 
 def rerun_ci(repo_full_name: str, workflow_run_id: int) -> dict[str, Any]:
@@ -894,6 +1140,7 @@ def rerun_ci(repo_full_name: str, workflow_run_id: int) -> dict[str, Any]:
         "POST",
         f"/repos/{repo_full_name}/actions/runs/{workflow_run_id}/rerun",
     )
+    _cache.clear_gh_cache()
     return {"status": "rerun_requested", "workflow_run_id": workflow_run_id}
 
 def heal_failing_pr(repo_full_name: str, pr_number: int | None = None) -> dict[str, Any]:
@@ -954,7 +1201,7 @@ def heal_failing_pr(repo_full_name: str, pr_number: int | None = None) -> dict[s
             "status": "no_fix",
             "pr_number": pr_num,
             "error_type": error.get("error_type"),
-            "reason": (error.get("reason") or "")[:300],
+            "reason": _truncate(error.get("reason") or "", _NO_FIX_REASON_LIMIT),
             "message": "No automated fix available for this error type. Consider manual fix or extend generate_fix_patch.",
         }
 
@@ -13,12 +13,17 @@ import logging
 import os
 import sys
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Any
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from . import github_client
+from .analysis import ai_analysis
+from .config import settings
 from .tools.analysis import register as register_analysis_tools
 from .tools.github import register as register_github_tools
 from .tools.workspace_tools import register as register_workspace_tools
@@ -30,11 +35,15 @@ async def lifespan(server: FastMCP):
     logger.info("OpenX MCP server starting")
     yield {}
     logger.info("OpenX MCP server shutting down")
+    # Read the module attributes at shutdown: the clients are created lazily.
     try:
-        from .github_client import _http_client
-
-        if _http_client is not None:
-            _http_client.close()
+        if github_client._http_client is not None:
+            github_client._http_client.close()
+    except Exception:
+        pass
+    try:
+        if ai_analysis._anthropic_client is not None:
+            ai_analysis._anthropic_client.close()
     except Exception:
         pass
 
@@ -55,11 +64,13 @@ register_github_tools(mcp)
 register_workspace_tools(mcp)
 register_analysis_tools(mcp)
 
-@mcp.resource("openx://config")
-def server_config() -> str:
-    """Current OpenX server configuration (secrets redacted)."""
-    from .config import settings
+def _dumps(payload: Any) -> str:
+    """Pretty JSON for list resources via orjson (several times faster than json.dumps)."""
+    return orjson.dumps(payload, default=str, option=orjson.OPT_INDENT_2).decode()
 
+@lru_cache(maxsize=1)
+def _config_json() -> str:
+    """Serialized once: settings are frozen for the life of the process."""
     return json.dumps(
         {
             "github_base_url": settings.github_base_url or "https://api.github.com",
@@ -72,6 +83,11 @@ def server_config() -> str:
         indent=2,
     )
 
+@mcp.resource("openx://config")
+def server_config() -> str:
+    """Current OpenX server configuration (secrets redacted)."""
+    return _config_json()
+
 @mcp.resource("openx://help")
 def server_help() -> str:
     """OpenX usage guide and full tool reference."""
@@ -80,24 +96,18 @@ def server_help() -> str:
 @mcp.resource("github://{owner}/{repo}/readme")
 def repo_readme(owner: str, repo: str) -> str:
     """README content for a GitHub repository."""
-    from .github_client import get_readme
-
-    result = get_readme(f"{owner}/{repo}")
+    result = github_client.get_readme(f"{owner}/{repo}")
     return result.get("content", "")
 
 @mcp.resource("github://{owner}/{repo}/prs")
 def repo_open_prs(owner: str, repo: str) -> str:
     """Open pull requests for a GitHub repository."""
-    from .github_client import list_open_prs
-
-    return json.dumps(list_open_prs(f"{owner}/{repo}"), indent=2, default=str)
+    return _dumps(github_client.list_open_prs(f"{owner}/{repo}"))
 
 @mcp.resource("github://{owner}/{repo}/issues/{state}")
 def repo_issues(owner: str, repo: str, state: str = "open") -> str:
     """Issues for a GitHub repository (state: open, closed, all)."""
-    from .github_client import list_issues
-
-    return json.dumps(list_issues(f"{owner}/{repo}", state), indent=2, default=str)
+    return _dumps(github_client.list_issues(f"{owner}/{repo}", state))
 
 @mcp.prompt()
 def analyze_repository(repo_path: str = "") -> str:
@@ -159,6 +169,7 @@ GitHub Tools:
   github_trigger_workflow     Trigger a workflow dispatch
   github_list_workflow_runs   List workflow runs
   github_get_workflow_run     Get workflow run details
+  github_await_workflow_run   Wait for a workflow run to complete
   github_run_gh_command       Run a raw gh CLI command
 
 CI/CD Self-Healing:
@@ -191,6 +202,24 @@ Resources:
   github://{owner}/{repo}/issues/{state}  Issues (open/closed/all)
 """
 
+def _install_uvloop() -> None:
+    """Use uvloop for the event loop when it is installed (not available on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    import asyncio
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+# CLI flag -> FastMCP transport; aliases map to the same value.
+_TRANSPORT_FLAGS: dict[str, str] = {
+    "--http": "streamable-http",
+    "--streamable-http": "streamable-http",
+    "--sse": "sse",
+    "--stdio": "stdio",
+}
+
 def main() -> None:
     """CLI entry point for the OpenX MCP server."""
     transport = "stdio"
@@ -201,12 +230,9 @@ def main() -> None:
     i = 0
     while i < len(args):
         arg = args[i]
-        if arg in ("--http", "--streamable-http"):
-            transport = "streamable-http"
-        elif arg == "--sse":
-            transport = "sse"
-        elif arg == "--stdio":
-            transport = "stdio"
+        selected = _TRANSPORT_FLAGS.get(arg)
+        if selected is not None:
+            transport = selected
         elif arg == "--host" and i + 1 < len(args):
             i += 1
             host = args[i]
@@ -217,6 +243,7 @@ def main() -> None:
 
     mcp.settings.host = host
     mcp.settings.port = port
+    _install_uvloop()
     mcp.run(transport=transport)
 
 if __name__ == "__main__":
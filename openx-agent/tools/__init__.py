@@ -0,0 +1,26 @@
+"""MCP tool modules and the helpers they share when registering tools."""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from typing import Any, Callable
+
+import anyio.to_thread
+
+def threaded(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a blocking tool so FastMCP awaits it in a worker thread.
+
+    FastMCP calls sync tools directly on the event loop, so one slow GitHub
+    request would stall every other MCP request. ``functools.wraps`` keeps the
+    name, docstring and signature FastMCP uses to build the tool schema.
+    Coroutine functions already yield to the loop and are returned unchanged.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return fn
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs))
+
+    return wrapper
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Any
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
-from mcp.server.fastmcp import FastMCP
+import anyio.from_thread
+import anyio.to_thread
+from mcp.server.fastmcp import Context, FastMCP
 
 from ..analysis.ai_analysis import analyze_with_ai
 from ..analysis.architecture import summarize_architecture
@@ -12,17 +16,61 @@ from ..analysis.format_report import format_analysis_report
 from ..analysis.static_analysis import analyze_static
 from ..config import config_settings
 
-def analyze_repo(path: str = "") -> Any:
+logger = logging.getLogger(__name__)
+
+class _ReviewLines:
+    """Forward streamed review text to the MCP client, one info log message per line.
+
+    Called from the worker thread running the analysis; each complete line is
+    sent on the event loop with ``anyio.from_thread``.
+    """
+
+    def __init__(self, ctx: Context):
+        self._ctx = ctx
+        self._pending = ""
+
+    def __call__(self, delta: str) -> None:
+        self._pending += delta
+        if "\n" not in delta:
+            return
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            self._send(line)
+
+    def flush(self) -> None:
+        self._send(self._pending)
+        self._pending = ""
+
+    def _send(self, line: str) -> None:
+        if not line.strip():
+            return
+        try:
+            anyio.from_thread.run(self._ctx.info, line)
+        except Exception as exc:  # a lost client must not fail the review
+            logger.debug("could not forward review line: %s", exc)
+
+def _analyze(root: str, on_text: Callable[[str], None] | None) -> Any:
+    # The two filesystem passes are independent; only the AI review needs both.
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="analysis") as pool:
+        static_future = pool.submit(analyze_static, root)
+        arch = summarize_architecture(root)
+        static_findings = static_future.result()
+    ai = analyze_with_ai({"static_findings": static_findings, "architecture": arch}, on_text)
+    return format_analysis_report(root, static_findings, arch, ai)
+
+async def analyze_repo(path: str = "", ctx: Context | None = None) -> Any:
     """Run full code analysis: static findings, architecture summary, and AI review.
 
     Detects bugs, performance issues, duplicate code, AI-generated patterns,
     and provides actionable recommendations. Omit path to analyze the workspace root.
+    The AI review is sent as log messages while it is generated.
     """
     root = path or config_settings.workspace_root
-    static_findings = analyze_static(root)
-    arch = summarize_architecture(root)
-    ai = analyze_with_ai({"static_findings": static_findings, "architecture": arch})
-    return format_analysis_report(root, static_findings, arch, ai)
+    lines = _ReviewLines(ctx) if ctx is not None else None
+    report = await anyio.to_thread.run_sync(_analyze, root, lines)
+    if lines is not None:
+        await anyio.to_thread.run_sync(lines.flush)
+    return report
 
 def register(mcp: FastMCP) -> None:
     mcp.add_tool(analyze_repo, name="analysis_analyze_repo")
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Callable
 
 from mcp.server.fastmcp import FastMCP
 
@@ -10,6 +10,7 @@ from ..config import resolve_repo
 from ..gh_cli import run_gh_command as _run_gh_command
 from ..github_client import (
     analyze_ci_failure as _analyze_ci_failure,
+    await_workflow_run as _await_workflow_run,
     apply_fix_to_pr as _apply_fix_to_pr,
     close_issue as _close_issue,
     comment_issue as _comment_issue,
@@ -35,6 +36,7 @@ from ..github_client import (
     trigger_workflow as _trigger_workflow,
     update_readme as _update_readme,
 )
+from . import threaded
 
 def list_repos(org: str | None = None) -> Any:
     """List repositories for the authenticated user or an organization."""
@@ -129,6 +131,13 @@ def get_workflow_run(repo_full_name: str, run_id: int) -> Any:
     """Get details for a specific workflow run."""
     return _get_workflow_run(repo_full_name, run_id)
 
+async def await_workflow_run(repo_full_name: str, run_id: int, timeout_s: float = 600) -> Any:
+    """Wait for a workflow run to complete, polling with jittered exponential backoff.
+
+    Returns the final run details, or the latest state with timed_out=true after timeout_s seconds (max 3600).
+    """
+    return await _await_workflow_run(repo_full_name, run_id, timeout_s)
+
 def run_gh_command(command: str) -> Any:
     """Run a GitHub CLI (gh) command. Allowed: pr, issue, repo, run, workflow, api.
 
@@ -159,8 +168,11 @@ def locate_code_context(repo: str, error_context: dict[str, Any]) -> Any:
     """Find relevant source files and code snippets for a CI error."""
     return _locate_code_context(repo, error_context)
 
-def generate_fix_patch(code_context: str, error: dict[str, Any]) -> Any:
-    """Generate a unified diff patch from code context and error information."""
+def generate_fix_patch(code_context: dict[str, Any] | str, error: dict[str, Any]) -> Any:
+    """Generate a unified diff patch from code context and error information.
+
+    Pass the object returned by locate_code_context as-is; a JSON string is also accepted.
+    """
     return _generate_fix_patch(code_context, error)
 
 def apply_fix_to_pr(repo: str, pr_number: int, patch: str) -> Any:
@@ -180,30 +192,37 @@ def heal_failing_pr(repo: str, pr_number: int | None = None) -> Any:
     """
     return _heal_failing_pr(repo, pr_number)
 
+# Registered as github_<function name>, in this order.
+_TOOLS: tuple[Callable[..., Any], ...] = (
+    list_repos,
+    list_prs,
+    get_pr,
+    create_pr,
+    comment_pr,
+    merge_pr,
+    get_readme,
+    update_readme,
+    list_issues,
+    get_issue,
+    create_issue,
+    comment_issue,
+    close_issue,
+    list_workflows,
+    trigger_workflow,
+    list_workflow_runs,
+    get_workflow_run,
+    await_workflow_run,
+    run_gh_command,
+    get_failing_prs,
+    get_ci_logs,
+    analyze_ci_failure,
+    locate_code_context,
+    generate_fix_patch,
+    apply_fix_to_pr,
+    rerun_ci,
+    heal_failing_pr,
+)
+
 def register(mcp: FastMCP) -> None:
-    mcp.add_tool(list_repos, name="github_list_repos")
-    mcp.add_tool(list_prs, name="github_list_prs")
-    mcp.add_tool(get_pr, name="github_get_pr")
-    mcp.add_tool(create_pr, name="github_create_pr")
-    mcp.add_tool(comment_pr, name="github_comment_pr")
-    mcp.add_tool(merge_pr, name="github_merge_pr")
-    mcp.add_tool(get_readme, name="github_get_readme")
-    mcp.add_tool(update_readme, name="github_update_readme")
-    mcp.add_tool(list_issues, name="github_list_issues")
-    mcp.add_tool(get_issue, name="github_get_issue")
-    mcp.add_tool(create_issue, name="github_create_issue")
-    mcp.add_tool(comment_issue, name="github_comment_issue")
-    mcp.add_tool(close_issue, name="github_close_issue")
-    mcp.add_tool(list_workflows, name="github_list_workflows")
-    mcp.add_tool(trigger_workflow, name="github_trigger_workflow")
-    mcp.add_tool(list_workflow_runs, name="github_list_workflow_runs")
-    mcp.add_tool(get_workflow_run, name="github_get_workflow_run")
-    mcp.add_tool(run_gh_command, name="github_run_gh_command")
-    mcp.add_tool(get_failing_prs, name="github_get_failing_prs")
-    mcp.add_tool(get_ci_logs, name="github_get_ci_logs")
-    mcp.add_tool(analyze_ci_failure, name="github_analyze_ci_failure")
-    mcp.add_tool(locate_code_context, name="github_locate_code_context")
-    mcp.add_tool(generate_fix_patch, name="github_generate_fix_patch")
-    mcp.add_tool(apply_fix_to_pr, name="github_apply_fix_to_pr")
-    mcp.add_tool(rerun_ci, name="github_rerun_ci")
-    mcp.add_tool(heal_failing_pr, name="github_heal_failing_pr")
+    for fn in _TOOLS:
+        mcp.add_tool(threaded(fn), name=f"github_{fn.__name__}")
@@ -15,6 +15,7 @@ from ..workspace import (
     read_file as _read_file,
     write_file as _write_file,
 )
+from . import threaded
 
 def read_file(repo_path: str = "", path: str = "README.md") -> Any:
     """Read a file from the local workspace.
@@ -53,10 +54,10 @@ def git_push(
     return _git_push(repo_path, remote, branch)
 
 def register(mcp: FastMCP) -> None:
-    mcp.add_tool(read_file, name="workspace_read_file")
-    mcp.add_tool(write_file, name="workspace_write_file")
-    mcp.add_tool(list_dir, name="workspace_list_dir")
-    mcp.add_tool(git_status, name="workspace_git_status")
-    mcp.add_tool(git_add, name="workspace_git_add")
-    mcp.add_tool(git_commit, name="workspace_git_commit")
-    mcp.add_tool(git_push, name="workspace_git_push")
+    mcp.add_tool(threaded(read_file), name="workspace_read_file")
+    mcp.add_tool(threaded(write_file), name="workspace_write_file")
+    mcp.add_tool(threaded(list_dir), name="workspace_list_dir")
+    mcp.add_tool(threaded(git_status), name="workspace_git_status")
+    mcp.add_tool(threaded(git_add), name="workspace_git_add")
+    mcp.add_tool(threaded(git_commit), name="workspace_git_commit")
+    mcp.add_tool(threaded(git_push), name="workspace_git_push")